@@ -2,8 +2,366 @@ import sympy as sp
 from sympy import S
 from sympy.calculus.util import continuous_domain, function_range
 from sympy.solvers.solveset import solveset, solveset_real
+from functools import cached_property, wraps
 import re, unicodedata
 
+import clasificacion
+import muestreo
+import raices as raices_numericas
+from instrumentacion import registro
+from resultados import Dominio, Evaluacion, Intersecciones, Recorrido, Valor
+
+
+# Segundos que se le dan a solveset antes de pasar a la búsqueda numérica
+PRESUPUESTO_SOLVESET = 4.0
+
+
+def _es_continuo(conjunto) -> bool:
+    """Intervalo o unión de intervalos: f se anula en todo un tramo."""
+    if isinstance(conjunto, sp.Interval):
+        return True
+    return isinstance(conjunto, sp.Union) and all(isinstance(a, sp.Interval) for a in conjunto.args)
+
+
+def _simplificar(valor):
+    """simplify solo si hace falta: un racional ya está en su forma final."""
+    if valor.is_Rational:
+        return valor
+    with registro.fase("simplify"):
+        return sp.simplify(valor)
+
+
+class _Bonito:
+    """Expresión que se pasa por el pretty printer recién al mostrarla."""
+    __slots__ = ("expr",)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+    def __getstate__(self):
+        return (self.expr,)
+
+    def __setstate__(self, estado):
+        self.expr, = estado
+
+    def __str__(self):
+        from sympy.printing.pretty import pretty
+        try:
+            return pretty(self.expr, use_unicode=True)
+        except Exception:
+            return str(self.expr)
+
+
+class Pasos:
+    """
+    Paso a paso de un cálculo, armado de forma diferida. Cada paso se guarda
+    como plantilla + argumentos (expresiones de SymPy incluidas) y el texto
+    se arma recién cuando alguien lo lee: iterar, indexar o len(). Así los
+    cálculos sin interfaz no pagan el formateo ni el pretty printer. Si se
+    crea con activo=False no guarda nada (modo solo resultados).
+    """
+    __slots__ = ("activo", "_crudos", "_texto")
+
+    def __init__(self, activo: bool = True):
+        self.activo = activo
+        self._crudos = []
+        self._texto = None
+
+    def __getstate__(self):
+        return self.activo, self._crudos
+
+    def __setstate__(self, estado):
+        self.activo, self._crudos = estado
+        self._texto = None
+
+    def agregar(self, plantilla: str, *args):
+        if self.activo:
+            self._crudos.append((plantilla, args))
+            self._texto = None
+
+    def siguiente(self) -> int:
+        """Número del próximo paso; las líneas sin número ("   x - 1 = 0") no cuentan."""
+        return 1 + sum(1 for p, _ in self._crudos if p[:1].isdigit() or p.startswith("{}."))
+
+    def textos(self) -> list:
+        if self._texto is None:
+            self._texto = [p.format(*args) if args else p for p, args in self._crudos]
+        return self._texto
+
+    def __iter__(self):
+        return iter(self.textos())
+
+    def __len__(self):
+        return len(self._crudos)
+
+    def __getitem__(self, i):
+        return self.textos()[i]
+
+    def __repr__(self):
+        return f"Pasos({self.textos()!r})"
+
+
+class SesionAnalisis:
+    """
+    Una función ya parseada y validada. Los cálculos simbólicos caros
+    (denominador, dominio continuo, raíces, puntos críticos) se hacen una
+    sola vez, la primera vez que algún análisis los pide, y se comparten.
+    """
+
+    def __init__(self, analizador, funcion_str: str):
+        self.analizador = analizador
+        self.funcion_str = funcion_str
+        self.x = sp.Symbol('x', real=True)
+        self.expr = None
+        self.error = None
+
+        if not isinstance(funcion_str, str) or funcion_str.strip() == "":
+            self.error = "La funcion no puede estar vacia"
+            return
+        try:
+            self.expr = analizador._sympify(funcion_str)
+        except sp.SympifyError:
+            self.error = "Formato de funcion invalido"
+            return
+        except ValueError as e:
+            self.error = str(e)
+            return
+        except Exception as e:
+            self.error = f"Error al validar la funcion: {e}"
+            return
+        if not self.expr.has(self.x):
+            self.expr = None
+            self.error = "La funcion debe contener la variable x"
+
+    @property
+    def valida(self) -> bool:
+        return self.error is None
+
+    @cached_property
+    def clase(self) -> str:
+        """polinomio, racional, radical, por_partes o general (ver clasificacion)."""
+        with registro.fase("clasificar"):
+            return clasificacion.clasificar(self.expr, self.x)
+
+    @property
+    def rapida(self) -> bool:
+        """Polinomio o racional: raíces y recorrido por el camino rápido."""
+        return self.clase in ("polinomio", "racional")
+
+    @cached_property
+    def denominador(self):
+        with registro.fase("denom"):
+            return self.analizador._denominador(self.expr)
+
+    @cached_property
+    def ceros_denominador(self):
+        """Ceros reales del denominador (lista vacía si no hay o no se pueden listar)."""
+        if self.denominador == 1:
+            return []
+        if self.denominador.is_polynomial(self.x):
+            try:
+                with registro.fase("raices_denominador"):
+                    return clasificacion.raices_reales(self.denominador, self.x)
+            except Exception:
+                pass
+        try:
+            with registro.fase("solveset_denominador"):
+                sol = solveset(self.denominador, self.x, S.Reals)
+        except Exception:
+            return []
+        if not isinstance(sol, sp.FiniteSet):
+            return []
+        return sorted(sol, key=lambda s: float(sp.N(s)))
+
+    @cached_property
+    def ceros_denominador_float(self):
+        """Los mismos ceros como floats, para descartar puntos sin SymPy."""
+        ceros = set()
+        for z in self.ceros_denominador:
+            try:
+                ceros.add(float(sp.N(z)))
+            except Exception:
+                continue
+        return ceros
+
+    @cached_property
+    def clave(self) -> str:
+        """Forma canónica de la expresión (para cachés por función)."""
+        return sp.srepr(self.expr)
+
+    @cached_property
+    def kernel(self):
+        """f(x) compilada a código numérico (ver muestreo.FuncionCompilada)."""
+        kernels = self.analizador.kernels
+        with registro.fase("compilar"):
+            if kernels is not None:
+                return kernels.compilar(self.expr, self.x, self.clave)
+            return muestreo.compilar(self.expr, self.x)
+
+    @cached_property
+    def dominio(self):
+        try:
+            with registro.fase("dominio_rapido"):
+                dominio = clasificacion.dominio_rapido(self.expr, self.x, self.clase,
+                                                       self.ceros_denominador)
+        except Exception:
+            dominio = None
+        if dominio is not None:
+            return dominio
+        with registro.fase("continuous_domain"):
+            return continuous_domain(self.expr, self.x, S.Reals)
+
+    @cached_property
+    def _ceros(self):
+        """
+        (raíces, método, tramos) de f(x) = 0. Primero solveset con tiempo
+        límite; si se pasa o no entrega una lista finita (ConditionSet,
+        soluciones periódicas) se buscan numéricamente con el kernel
+        compilado. `tramos` son los intervalos donde f vale 0 en todo punto.
+        """
+        f, x = self.expr, self.x
+        if self.rapida:
+            try:
+                with registro.fase("raices_poly"):
+                    return [Valor.desde(r) for r in clasificacion.raices_racional(f, x)], "exacto", []
+            except Exception:
+                pass
+        sol = None
+        try:
+            with raices_numericas.limite_tiempo(PRESUPUESTO_SOLVESET), registro.fase("solveset"):
+                sol = solveset(sp.Eq(f, 0), x, domain=S.Reals)
+        except raices_numericas.TiempoAgotado:
+            registro.contar("solveset_tiempo_agotado")
+        except Exception:
+            try:
+                with raices_numericas.limite_tiempo(PRESUPUESTO_SOLVESET), registro.fase("solveset_real"):
+                    sol = solveset_real(sp.Eq(f, 0), x)
+            except Exception:
+                sol = None
+
+        if isinstance(sol, sp.FiniteSet):
+            reales = []
+            for s in sol:
+                if s.is_real and self.analizador.esta_en_dominio(self, s):
+                    reales.append(s)
+            reales.sort(key=lambda s: float(sp.N(s)))
+            return [Valor.desde(s) for s in reales], "exacto", []
+        if sol is S.EmptySet:
+            return [], "exacto", []
+        if sol is not None and _es_continuo(sol):
+            try:
+                sol = sol.intersect(self.dominio)
+            except Exception:
+                pass
+            if _es_continuo(sol):
+                return [], "exacto", list(sol.args if isinstance(sol, sp.Union) else [sol])
+
+        with registro.fase("raices_numericas"):
+            encontradas, tramos = raices_numericas.buscar_ceros(self.kernel)
+        return ([Valor(None, r) for r in encontradas], "numerico",
+                [sp.Interval(sp.Float(a), sp.Float(b)) for a, b in tramos])
+
+    @property
+    def raices(self):
+        """Raíces reales de f que pertenecen al dominio (lista de Valor)."""
+        return self._ceros[0]
+
+    @property
+    def metodo_raices(self) -> str:
+        """"exacto" si las dio solveset, "numerico" si salieron de la búsqueda numérica."""
+        return self._ceros[1]
+
+    @property
+    def tramos_nulos(self):
+        """Intervalos (Interval de SymPy) donde f vale 0 en todo punto."""
+        return self._ceros[2]
+
+    @cached_property
+    def _criticos_exactos(self):
+        """
+        Abscisas exactas (SymPy) donde la gráfica puede cortarse: ceros del
+        denominador, bordes del dominio y quiebres de Piecewise. Una por
+        valor en float, ordenadas.
+        """
+        candidatos = list(self.ceros_denominador)
+        try:
+            candidatos.extend(self.dominio.boundary)
+        except Exception:
+            pass
+        try:
+            for pw in self.expr.atoms(sp.Piecewise):
+                for _, cond in pw.as_expr_set_pairs():
+                    if hasattr(cond, 'boundary'):
+                        candidatos.extend(getattr(cond.boundary, 'args', (cond.boundary,)))
+        except Exception:
+            pass
+        por_float = {}
+        for c in candidatos:
+            if not (getattr(c, "is_number", False) and c.is_finite):
+                continue
+            try:
+                por_float.setdefault(float(sp.N(c)), c)
+            except Exception:
+                continue
+        return sorted(por_float.items())
+
+    @cached_property
+    def puntos_criticos(self):
+        """Abscisas (float) donde la gráfica puede cortarse (ver _criticos_exactos)."""
+        return [cf for cf, _ in self._criticos_exactos]
+
+    @cached_property
+    def criticos(self):
+        """
+        (abscisa en float, excluida del dominio) por punto crítico. La
+        pertenencia se decide con el valor exacto: sqrt(2) redondeado ya no
+        es un cero de x**2 - 2. Si SymPy no puede con el dominio (Piecewise)
+        se prueba el punto con esta_en_dominio.
+        """
+        salida = []
+        for cf, c in self._criticos_exactos:
+            try:
+                excluido = c not in self.dominio
+            except Exception:
+                excluido = not self.analizador.esta_en_dominio(self, c)
+            salida.append((cf, bool(excluido)))
+        return salida
+
+    @property
+    def excluidos_float(self):
+        """Puntos críticos que el dominio excluye (cortes de la curva), en float."""
+        return [cf for cf, excluido in self.criticos if excluido]
+
+
+def _con_cache(operacion: str):
+    """
+    Pone la caché de resultados (si el analizador tiene una) delante de un
+    método público. La clave usa la expresión canónica, no el texto.
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, funcion, *args):
+            if self.cache is None:
+                return metodo(self, funcion, *args)
+            sesion = self.sesion(funcion)
+            if not sesion.valida:
+                return metodo(self, sesion, *args)
+            extra = [self._sanitize_number(a) if isinstance(a, str) else a for a in args]
+            # un resultado sin pasos no sirve a quien sí los pide
+            nombre = operacion if self.con_pasos else operacion + ":sin_pasos"
+            clave = self.cache.clave(nombre, sesion.expr, *extra)
+            encontrado, valor = self.cache.obtener(clave)
+            if encontrado:
+                registro.contar("cache_hits")
+                return valor
+            registro.contar("cache_misses")
+            valor = metodo(self, sesion, *args)
+            self.cache.guardar(clave, valor)
+            return valor
+        return envoltura
+    return decorador
+
+
 class AnalizadorFunciones:
     FUNCIONES_PERMITIDAS = {
         # funciones
@@ -17,7 +375,13 @@ class AnalizadorFunciones:
         'E': sp.E, 'pi': sp.pi,
     }
 
-    def __init__(self):
+    def __init__(self, cache=None, con_pasos: bool = True, kernels=None):
+        # caché opcional de resultados (ver cache_resultados.CacheResultados)
+        self.cache = cache
+        # caché opcional de kernels compilados (ver muestreo.CacheKernels)
+        self.kernels = kernels
+        # con_pasos=False: modo solo resultados, sin paso a paso
+        self.con_pasos = con_pasos
         self._RE_NUM = re.compile(
             r'^[+\-]?(?:\d+(?:\.\d+)?|\.\d+)(?:[eE][+\-]?\d+)?'
             r'(?:/[+\-]?(?:\d+(?:\.\d+)?|\.\d+)(?:[eE][+\-]?\d+)?)?$'
@@ -28,39 +392,33 @@ class AnalizadorFunciones:
         if not isinstance(s, str) or len(s) > 500:
             raise ValueError("Expresión inválida o demasiado larga.")
         x = sp.Symbol('x', real=True)
-        expr = sp.sympify(s, locals={**self.FUNCIONES_PERMITIDAS, 'x': x})
+        with registro.fase("sympify"):
+            expr = sp.sympify(s, locals={**self.FUNCIONES_PERMITIDAS, 'x': x})
         # bloquear símbolos extraños
         if any(sym.name != 'x' for sym in expr.free_symbols):
             raise ValueError("Solo se admite la variable x.")
         return expr
 
+    def sesion(self, funcion) -> SesionAnalisis:
+        """
+        Devuelve la sesión de análisis de la función. Acepta el texto de la
+        función o una sesión ya creada (que se reutiliza tal cual).
+        """
+        if isinstance(funcion, SesionAnalisis):
+            return funcion
+        return SesionAnalisis(self, funcion)
+
     def _pretty(self, expr) -> str:
-        from sympy.printing.pretty import pretty
-        try:
-            if not funcion_str or funcion_str.strip() == "":
-                return False, "La funcion no puede estar vacia"
-            
-            x = sp.Symbol('x')
-            f_x = sp.sympify(funcion_str)
-            
-            # verifica que contenga la variable x
-            if not f_x.has(x):
-                return False, "La funcion debe contener la variable x"
-            
-            # verifica que solo sean funciones polinomicas o racionales
-            funciones_no_permitidas = [sp.sin, sp.cos, sp.tan, sp.log, sp.exp, sp.sqrt]
-            atoms = f_x.atoms(sp.Function)
-            
-            for atom in atoms:
-                if any(isinstance(atom, func) for func in funciones_no_permitidas):
-                    return False, "Solo se permiten funciones polinomicas y racionales"
-            
-            return True, "Funcion valida"
-            
-        except sp.SympifyError:
-            return False, "Formato de funcion invalido"
-        except Exception as e:
-            return False, f"Error al validar la funcion: {e}"
+        return str(_Bonito(expr))
+
+    def _pasos(self) -> Pasos:
+        return Pasos(activo=self.con_pasos)
+
+    def validar_funcion(self, funcion_str):
+        sesion = self.sesion(funcion_str)
+        if not sesion.valida:
+            return False, sesion.error
+        return True, "Funcion valida"
 
     def _sanitize_number(self, s: str) -> str:
         # Normaliza Unicode, cambia coma por punto, quita espacios y guiones Unicode
@@ -87,227 +445,312 @@ class AnalizadorFunciones:
         # número simple
         return sp.nsimplify(s)
 
+    def _to_float(self, valor) -> float:
+        """Como _to_exact pero sin SymPy: para evaluar tablas numéricas."""
+        if isinstance(valor, (int, float, sp.Basic)):
+            xf = float(valor)
+        else:
+            if not valor or valor.strip() == "":
+                raise ValueError("Valor vacío.")
+            s = self._sanitize_number(valor)
+            if not self._RE_NUM.fullmatch(s):
+                raise ValueError("Valor inválido para evaluar.")
+            if '/' in s:
+                a, b = s.split('/', 1)
+                if float(b) == 0:
+                    raise ValueError("División por cero en el valor.")
+                xf = float(a) / float(b)
+            else:
+                xf = float(s)
+        # inf y nan (1e400 se lee como inf) no son un x que evaluar
+        if not -float("inf") < xf < float("inf"):
+            raise ValueError("Valor inválido para evaluar.")
+        return xf
+
     def _denominador(self, f):
+        # as_numer_denom junta las fracciones sin simplificar: los factores
+        # comunes (huecos como en (x**2-x)/(x-1)) siguen en el denominador
+        return f.as_numer_denom()[1]
+
+    @_con_cache("evaluar")
+    def evaluar_funcion(self, funcion_str, x_val_str: str) -> Evaluacion:
+        sesion = self.sesion(funcion_str)
+        x = sesion.x
+        pasos = self._pasos()
+        if not sesion.valida:
+            return Evaluacion(x_val_str, pasos=pasos, error="Función inválida.")
+        f = sesion.expr
+
         try:
-            # validar que x_val sea un numero
-            try:
-                x_val = float(x_val)
-            except (ValueError, TypeError):
-                return "Error: el valor de x debe ser un numero", None
-            
-            x = sp.Symbol('x')
-            f_x = sp.sympify(funcion_str)
-            
-            # revisar si el valor esta en el dominio
-            if not self.esta_en_dominio(f_x, x_val):
-                return "Error: el valor esta fuera del dominio de la funcion", None
-            
-            resultado = f_x.subs(x, x_val)
-
-    def evaluar_funcion(self, funcion_str: str, x_val_str: str):
-        x = sp.Symbol('x', real=True)
-        pasos = []
+            xv = self._to_exact(x_val_str)
+        except ValueError as e:
+            return Evaluacion(x_val_str, pasos=pasos, error=str(e))
+        x_valor = Valor.desde(xv)
+
+        pasos.agregar("Función: f(x) = {}", _Bonito(f))
+        pasos.agregar("Sustitución: x = {}", _Bonito(xv))
+
+        # Validación de dominio puntual
         try:
-            f = self._sympify(funcion_str)
+            den = sesion.denominador
+            if den != 1 and _simplificar(den.subs(x, xv)) == 0:
+                pasos.agregar("Denominador = 0 ⇒ punto fuera del dominio.")
+                return Evaluacion(x_val_str, x_valor, pasos=pasos,
+                                  error="División por cero en ese punto.")
         except Exception:
-            return {"ok": False, "error": "Función inválida.", "steps": []}
+            pass
 
-        except sp.SympifyError:
-            return "Error: funcion no valida", None
-        except ZeroDivisionError:
-            return "Error: division por cero en ese punto", None
+        try:
+            exacto = _simplificar(f.subs(x, xv))
         except Exception as e:
-            return f"Error inesperado: {e}", None
+            return Evaluacion(x_val_str, x_valor, pasos=pasos, error=f"Error inesperado: {e}")
+        pasos.agregar("Resultado exacto: f({}) = {}", xv, _Bonito(exacto))
 
-        pasos.append(f"Función: f(x) = {self._pretty(f)}")
-        pasos.append(f"Sustitución: x = {self._pretty(xv)}")
+        # Chequeos
+        if exacto.has(sp.I) or (hasattr(exacto, "is_real") and exacto.is_real is False):
+            return Evaluacion(x_val_str, x_valor, pasos=pasos, error="Resultado complejo.")
+        if exacto.has(sp.zoo) or exacto.has(sp.oo) or exacto.has(-sp.oo) or exacto.has(sp.nan):
+            return Evaluacion(x_val_str, x_valor, pasos=pasos, error="Resultado no finito.")
 
-        # Validación de dominio puntual
         try:
-            den = self._denominador(f)
-            if sp.simplify(den.subs(x, xv)) == 0:
-                pasos.append("Denominador = 0 ⇒ punto fuera del dominio.")
-                return {"ok": False, "error": "División por cero en ese punto.", "steps": pasos}
+            valor = float(sp.N(exacto))
         except Exception:
-            pass
-        
-        # resultado final
-        paso_final = len(pasos) + 1
-        pasos.append(f"{paso_final}. Resultado: f({x_val}) = {resultado}")
-        pasos.append(f"{paso_final + 1}. Punto en la grafica: ({x_val}, {resultado})")
-        
-        return pasos
+            return Evaluacion(x_val_str, x_valor, pasos=pasos, error="Resultado no numérico.")
+        pasos.agregar("Valor aproximado: {}", valor)
+
+        return Evaluacion(x_val_str, x_valor, Valor(exacto, valor), pasos)
+
+    def evaluar_lote(self, funcion, valores, exacto=False):
+        """
+        Evalúa f en muchos x de una vez (tablas de valores). Los valores
+        pueden ser textos como en evaluar_funcion ("1/2", "0,5") o números.
+
+        La función se parsea y compila una sola vez y los puntos se evalúan
+        con el kernel numérico; los ceros del denominador se descartan
+        contra un conjunto precalculado. Con exacto=True además se calcula
+        el valor exacto con SymPy (bastante más lento). No genera pasos.
+
+        Devuelve una lista de Evaluacion, en el orden de `valores`.
+        """
+        sesion = self.sesion(funcion)
+        if not sesion.valida:
+            return [Evaluacion(v, error="Función inválida.") for v in valores]
+
+        resultados, validos, xs = [], [], []
+        for v in valores:
+            try:
+                xf = self._to_float(v)
+            except (ValueError, TypeError, OverflowError) as e:
+                error = str(e) if isinstance(e, ValueError) else "Valor inválido para evaluar."
+                resultados.append(Evaluacion(v, error=error))
+                continue
+            if xf in sesion.ceros_denominador_float:
+                resultados.append(Evaluacion(v, Valor(None, xf), error="División por cero en ese punto."))
+                continue
+            validos.append(len(resultados))
+            resultados.append(None)
+            xs.append(xf)
+
+        with registro.fase("evaluar_lote"):
+            ys = sesion.kernel.evaluar_lote(xs)
+        for i, xf, y in zip(validos, xs, ys):
+            v = valores[i]
+            if exacto:
+                resultados[i] = self._evaluar_exacto(sesion, v, xf, y)
+            elif y is None:
+                resultados[i] = Evaluacion(v, Valor(None, xf), error="Resultado complejo o no finito.")
+            else:
+                resultados[i] = Evaluacion(v, Valor(None, xf), Valor(None, y))
+        return resultados
+
+    def _evaluar_exacto(self, sesion, v, xf, y):
+        """Un punto de evaluar_lote con su valor exacto; y es el del kernel."""
+        try:
+            xv = self._to_exact(v) if isinstance(v, str) else sp.nsimplify(v)
+            x_valor = Valor(xv, xf)
+            if xv in sesion.ceros_denominador:
+                return Evaluacion(v, x_valor, error="División por cero en ese punto.")
+            exacto = _simplificar(sesion.expr.subs(sesion.x, xv))
+        except Exception as e:
+            return Evaluacion(v, Valor(None, xf), error=f"Error inesperado: {e}")
+        if exacto.has(sp.I, sp.zoo, sp.oo, -sp.oo, sp.nan) or exacto.is_real is False:
+            return Evaluacion(v, x_valor, error="Resultado complejo o no finito.")
+        if y is None:
+            # el kernel puede fallar donde SymPy no (p. ej. desbordes intermedios)
+            y = Valor.desde(exacto).numero
+            if y is None:
+                return Evaluacion(v, x_valor, error="Resultado no numérico.")
+        return Evaluacion(v, x_valor, Valor(exacto, y))
 
     def esta_en_dominio(self, f_x, x_val):
         """
         revisa si un valor pertenece al dominio de una funcion
         """
-        x = sp.Symbol('x')
+        if isinstance(f_x, SesionAnalisis):
+            sesion, f_x = f_x, f_x.expr
+            denominador = sesion.denominador
+        else:
+            denominador = self._denominador(f_x)
+        x = sp.Symbol('x', real=True)
 
         try:
             # revisar denominadores
-            denominador = sp.denom(f_x)
             if denominador != 1:
                 valor_denominador = denominador.subs(x, x_val)
                 if valor_denominador == 0:
                     return False
-            
+
             # revisar que no genere numeros complejos
             resultado_prueba = f_x.subs(x, x_val)
-            if resultado_prueba.is_complex or resultado_prueba.has(sp.I):
+            if resultado_prueba.is_real is False or resultado_prueba.has(sp.I):
+                return False
+            if resultado_prueba.has(sp.zoo) or resultado_prueba.has(sp.nan):
                 return False
-                
+
             return True
-            
+
         except:
             return False
 
-    def calcular_dominio(self, funcion_str):
+    @_con_cache("dominio")
+    def calcular_dominio(self, funcion_str) -> Dominio:
         """
         calcula el dominio con explicacion paso a paso
         """
         # validar funcion primero
-        es_valida, mensaje = self.validar_funcion(funcion_str)
-        if not es_valida:
-            return f"Error: {mensaje}", []
+        sesion = self.sesion(funcion_str)
+        if not sesion.valida:
+            return Dominio(None, (), self._pasos(), f"Error: {sesion.error}")
 
         try:
-            x = sp.Symbol('x')
-            f_x = sp.sympify(funcion_str)
-            
-            pasos = []
-            pasos.append(f"1. Funcion: f(x) = {f_x}")
-            pasos.append("2. Para encontrar el dominio, buscamos valores que hagan la funcion indefinida")
+            f_x = sesion.expr
 
-            restricciones = []
+            pasos = self._pasos()
+            pasos.agregar("1. Funcion: f(x) = {}", f_x)
+            pasos.agregar("2. Para encontrar el dominio, buscamos valores que hagan la funcion indefinida")
 
             # revisar denominadores
-            denominador = sp.denom(f_x)
+            denominador = sesion.denominador
             if denominador != 1:
-                pasos.append(f"3. El denominador es: {denominador}")
-                pasos.append("4. El denominador no puede ser cero, resolvemos:")
-                pasos.append(f"   {denominador} = 0")
-                
-                zeros = sp.solve(denominador, x)
-                zeros_reales = [z for z in zeros if z.is_real]
-                
+                pasos.agregar("3. El denominador es: {}", denominador)
+                pasos.agregar("4. El denominador no puede ser cero, resolvemos:")
+                pasos.agregar("   {} = 0", denominador)
+
+                zeros_reales = sesion.ceros_denominador
                 if zeros_reales:
-                    pasos.append(f"5. Valores que hacen cero el denominador: {zeros_reales}")
-                    restricciones.extend(zeros_reales)
+                    pasos.agregar("5. Valores que hacen cero el denominador: {}", zeros_reales)
                 else:
-                    pasos.append("5. No hay valores reales que hagan cero el denominador")
+                    pasos.agregar("5. No hay valores reales que hagan cero el denominador")
             else:
-                pasos.append("3. La funcion es polinomica (no tiene denominador)")
+                pasos.agregar("3. La funcion no tiene denominador que se anule")
 
-            # Chequeos
-            if exacto.has(sp.I) or (hasattr(exacto, "is_real") and exacto.is_real is False):
-                return {"ok": False, "error": "Resultado complejo.", "steps": pasos}
-            if exacto.has(sp.zoo) or exacto.has(sp.oo) or exacto.has(-sp.oo):
-                return {"ok": False, "error": "Resultado no finito.", "steps": pasos}
+            # raices, logaritmos, etc. quedan cubiertos por el dominio continuo
+            dominio = sesion.dominio
+            pasos.agregar("{}. Se descartan ademas raices de negativos y logaritmos de no positivos",
+                          pasos.siguiente())
+            pasos.agregar("{}. Dominio: {}", pasos.siguiente(), dominio)
 
-            return dominio_str, pasos
+            excluidos = tuple(Valor.desde(z) for z in sesion.ceros_denominador)
+            return Dominio(dominio, excluidos, pasos)
 
         except Exception as e:
-            return f"Error al calcular dominio: {e}", []
+            return Dominio(None, (), self._pasos(), f"Error al calcular dominio: {e}")
 
-    def calcular_intersecciones(self, funcion_str):
+    @_con_cache("intersecciones")
+    def calcular_intersecciones(self, funcion_str) -> Intersecciones:
         # primero valida la funcion
-        es_valida, mensaje = self.validar_funcion(funcion_str)
-        if not es_valida:
-            return f"Error: {mensaje}", [], f"Error: {mensaje}", []
+        sesion = self.sesion(funcion_str)
+        if not sesion.valida:
+            return Intersecciones(None, (), self._pasos(), self._pasos(), f"Error: {sesion.error}")
 
         try:
-            x = sp.Symbol('x')
-            f_x = sp.sympify(funcion_str)
+            x = sesion.x
+            f_x = sesion.expr
 
             # pasos para interseccion con eje y
-            pasos_y = []
-            pasos_y.append(f"1. Funcion: f(x) = {f_x}")
-            pasos_y.append("2. Para interseccion con eje Y, evaluamos f(0):")
-
-        # Intersección con eje Y si 0 ∈ dominio
-        y_pair = None
-        try:
-            dom0 = continuous_domain(f, x, S.Reals)
-            if 0 in dom0:
-                y0 = f.subs(x, 0)
-                if y0.is_real is not False:
-                    y_pair = (0.0, float(sp.N(y0)))
-        except Exception:
-            pass
-
-        # Raíces reales
-        x_list = []
-        try:
-            sol = solveset(sp.Eq(f, 0), x, domain=S.Reals)
-            for s in sol:
+            pasos_y = self._pasos()
+            pasos_y.agregar("1. Funcion: f(x) = {}", f_x)
+            pasos_y.agregar("2. Para interseccion con eje Y, evaluamos f(0):")
+
+            # Intersección con eje Y si 0 ∈ dominio; si SymPy no puede con el
+            # dominio (Piecewise) alcanza con probar x = 0
+            en_dominio = self.esta_en_dominio(sesion, 0)
+            if en_dominio:
                 try:
-                    x_list.append(float(sp.N(s)))
+                    en_dominio = 0 in sesion.dominio
                 except Exception:
-                    continue
-        except Exception:
-            try:
-                sol2 = solveset_real(sp.Eq(f, 0), x)
-                for s in sol2:
-                    x_list.append(float(sp.N(s)))
-            except Exception:
-                pass
-
-        return {"y": y_pair, "x": x_list}
-
-            x_int_reales = []
-            for sol in soluciones:
-                if sol.is_real and self.esta_en_dominio(f_x, sol):
-                    x_int_reales.append(sol)
-
-            if x_int_reales:
-                puntos = [f"({sol}, 0)" for sol in x_int_reales]
-                interseccion_x = f"Puntos: {', '.join(puntos)}"
-                pasos_x.append(f"5. Intersecciones con eje X: {interseccion_x}")
+                    pass
+            if en_dominio:
+                y0 = sp.simplify(f_x.subs(x, 0))
+                interseccion_y = Valor.desde(y0)
+                pasos_y.agregar("3. f(0) = {}", y0)
+                pasos_y.agregar("4. Interseccion con eje Y: (0, {})", y0)
             else:
-                interseccion_x = "no existen intersecciones reales"
-                pasos_x.append("5. No hay intersecciones reales con eje X")
+                interseccion_y = None
+                pasos_y.agregar("3. x = 0 no pertenece al dominio, no hay interseccion con eje Y")
+
+            # pasos para interseccion con eje x
+            pasos_x = self._pasos()
+            pasos_x.agregar("1. Funcion: f(x) = {}", f_x)
+            pasos_x.agregar("2. Para interseccion con eje X, resolvemos f(x) = 0:")
+            pasos_x.agregar("3. {} = 0", f_x)
+            pasos_x.agregar("4. Se conservan solo las soluciones reales dentro del dominio")
+
+            resultado = Intersecciones(interseccion_y, tuple(sesion.raices), pasos_y, pasos_x,
+                                       metodo_x=sesion.metodo_raices,
+                                       tramos_x=tuple(sesion.tramos_nulos))
+            if resultado.metodo_x == "numerico":
+                a, b = raices_numericas.VENTANA
+                pasos_x.agregar("{}. No hay solucion exacta a mano: se buscan numericamente en [{}, {}]"
+                                " (cambio de signo y metodo de Brent)", pasos_x.siguiente(), a, b)
+            if resultado.x or resultado.tramos_x:
+                pasos_x.agregar("{}. Intersecciones con eje X: {}", pasos_x.siguiente(), resultado.texto_x)
+            else:
+                pasos_x.agregar("{}. No hay intersecciones reales con eje X", pasos_x.siguiente())
 
-            return interseccion_y, pasos_y, interseccion_x, pasos_x
+            return resultado
 
         except Exception as e:
             error_msg = f"Error al calcular intersecciones: {e}"
-            return error_msg, [], error_msg, []
+            return Intersecciones(None, (), self._pasos(), self._pasos(), error_msg)
 
-    def calcular_recorrido(self, funcion_str):
+    @_con_cache("recorrido")
+    def calcular_recorrido(self, funcion_str) -> Recorrido:
         """
         Calcula el recorrido de la función con pasos explicativos.
         """
         # validar primero
-        es_valida, mensaje = self.validar_funcion(funcion_str)
-        if not es_valida:
-            return f"Error: {mensaje}", []
+        sesion = self.sesion(funcion_str)
+        if not sesion.valida:
+            return Recorrido(None, self._pasos(), f"Error: {sesion.error}")
 
         try:
-            if isinstance(f, sp.Piecewise):
-                for _, cond in f.as_expr_set_pairs():
-                    if hasattr(cond, 'boundary'):
-                        b = cond.boundary
-                        for el in getattr(b, 'args', (b,)):
-                            try:
-                                for s in getattr(el, 'args', (el,)):
-                                    if getattr(s, "is_number", False):
-                                        critical.add(float(sp.N(s)))
-                            except Exception:
-                                continue
-        except Exception:
-            pass
+            x = sesion.x
+            f_x = sesion.expr
 
-            pasos = []
-            pasos.append(f"1. Función: f(x) = {f_x}")
-            pasos.append("2. Usamos análisis simbólico para determinar el rango.")
+            pasos = self._pasos()
+            pasos.agregar("1. Función: f(x) = {}", f_x)
 
-            # rango con sympy
-            recorrido = function_range(f_x, x, sp.S.Reals)
+            recorrido = None
+            if sesion.rapida:
+                # polinomios y racionales: puntos críticos y límites
+                try:
+                    with registro.fase("recorrido_racional"):
+                        recorrido = clasificacion.recorrido_racional(f_x, x)
+                except Exception:
+                    recorrido = None
+            if recorrido is not None:
+                pasos.agregar("2. Es una funcion {}: se evalua en los puntos criticos (f'(x) = 0)"
+                              " y se toman limites en los polos y en ±oo.", sesion.clase)
+            else:
+                pasos.agregar("2. Usamos análisis simbólico para determinar el rango.")
+                # rango con sympy
+                with registro.fase("function_range"):
+                    recorrido = function_range(f_x, x, sp.S.Reals)
 
-            pasos.append(f"3. El recorrido calculado es: {recorrido}")
+            pasos.agregar("3. El recorrido calculado es: {}", recorrido)
 
-            return str(recorrido), pasos
+            return Recorrido(recorrido, pasos)
 
         except Exception as e:
-            return f"Error al calcular recorrido: {e}", []
+            return Recorrido(None, self._pasos(), f"Error al calcular recorrido: {e}")
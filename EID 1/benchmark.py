@@ -0,0 +1,284 @@
+"""
+Benchmark del analizador (sin interfaz gráfica).
+
+Mide cada fase (parseo, dominio, recorrido, intersecciones, evaluación,
+compilación y muestreo) sobre un corpus fijo de funciones, con varias
+repeticiones, y el tiempo de importar los módulos del arranque. Cada
+caso corre en un proceso aparte con tiempo límite, para que una entrada
+patológica no cuelgue la corrida.
+
+    python benchmark.py --guardar base.json
+    python benchmark.py --comparar base.json
+"""
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+CORPUS = {
+    "polinomios": ["x**2 - 4", "x**3 - 6*x**2 + 11*x - 6", "x**5 - x + 1"],
+    "racionales": ["(x-1)/(x+2)", "1/(x**2-4)", "(x**2+1)/(x**3-x)"],
+    "radicales": ["sqrt(x+1)", "sqrt(4 - x**2)", "(x+1)**(1/3)"],
+    "trigonometricas": ["sin(x)", "tan(x)", "sin(x)/x"],
+    "por_partes": ["Abs(x-1)", "floor(x)", "Piecewise((x, x<0), (x**2, True))"],
+    "patologicas": ["sin(x)/x + exp(-x**2)", "x**3*sin(x) + exp(x)*cos(x)",
+                    "cos(x) - x", "sin(50*x)"],
+}
+
+# Módulos cuyo import en frío se mide (cada uno en un intérprete nuevo)
+MODULOS_ARRANQUE = ("interfaz_usuario", "analisis_funciones", "lienzo")
+
+FASES = ("parseo", "dominio", "recorrido", "intersecciones", "evaluacion",
+         "compilar", "compilar_desde_disco", "muestreo_adaptativo", "muestreo_uniforme")
+
+# carpeta de kernels del proceso que mide (se borra al terminar)
+_kernels = None
+
+
+def _percentil(valores, p):
+    orden = sorted(valores)
+    k = max(0, min(len(orden) - 1, round(p / 100 * (len(orden) - 1))))
+    return orden[k]
+
+
+def _fase(analizador, funcion, fase):
+    """Devuelve una función sin argumentos que ejecuta la fase desde cero."""
+    import muestreo
+    if fase == "parseo":
+        return lambda: analizador._sympify(funcion)
+
+    # cada repetición usa una sesión nueva: no se reutiliza nada cacheado
+    sesion = analizador.sesion(funcion)
+    if fase == "dominio":
+        return lambda: analizador.calcular_dominio(sesion)
+    if fase == "recorrido":
+        return lambda: analizador.calcular_recorrido(sesion)
+    if fase == "intersecciones":
+        return lambda: analizador.calcular_intersecciones(sesion)
+    if fase == "evaluacion":
+        return lambda: analizador.evaluar_funcion(sesion, "2")
+    if fase == "compilar":
+        return lambda: muestreo.compilar(sesion.expr, sesion.x)
+    if fase == "compilar_desde_disco":
+        # código ya generado por otra sesión: memoria vacía, fuente en disco
+        global _kernels
+        if _kernels is None:
+            _kernels = tempfile.TemporaryDirectory(prefix="kernels_")
+        muestreo.CacheKernels(carpeta=_kernels.name).compilar(sesion.expr, sesion.x)
+        return lambda: muestreo.CacheKernels(carpeta=_kernels.name).compilar(sesion.expr, sesion.x)
+    kernel = muestreo.compilar(sesion.expr, sesion.x)
+    if fase == "muestreo_adaptativo":
+        return lambda: muestreo.muestrear_adaptativo(kernel, -10, 10, y_clip=50.0)
+    if fase == "muestreo_uniforme":
+        return lambda: kernel.evaluar_lote(muestreo.linspace(-10, 10, 10000), y_clip=50.0)
+    raise ValueError(fase)
+
+
+def medir_caso(funcion, repeticiones, salida):
+    """Proceso hijo: mide todas las fases de una función y manda los resultados."""
+    from analisis_funciones import AnalizadorFunciones
+    from sympy.core.cache import clear_cache
+    analizador = AnalizadorFunciones()
+    for fase in FASES:
+        tiempos = []
+        for _ in range(repeticiones):
+            # en frío: SymPy memoiza internamente y falsearía las repeticiones
+            clear_cache()
+            ejecutar = _fase(analizador, funcion, fase)
+            t0 = time.perf_counter()
+            ejecutar()
+            tiempos.append(time.perf_counter() - t0)
+        # memoria pico en una pasada aparte (tracemalloc altera los tiempos)
+        clear_cache()
+        ejecutar = _fase(analizador, funcion, fase)
+        tracemalloc.start()
+        ejecutar()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        salida.put((fase, _estadisticas(tiempos, pico)))
+    salida.put(None)
+
+
+def _estadisticas(tiempos, pico) -> dict:
+    return {
+        "n": len(tiempos),
+        "media": sum(tiempos) / len(tiempos),
+        "min": min(tiempos),
+        "p50": _percentil(tiempos, 50),
+        "p90": _percentil(tiempos, 90),
+        "max": max(tiempos),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+
+_IMPORTAR = """
+import sys, time, tracemalloc
+if sys.argv[2] == "memoria":
+    tracemalloc.start()
+t0 = time.perf_counter()
+__import__(sys.argv[1])
+print(time.perf_counter() - t0, tracemalloc.get_traced_memory()[1])
+"""
+
+
+def medir_import(modulo, repeticiones, timeout):
+    """Tiempo de `import modulo` en un intérprete nuevo (sin nada cargado de antes)."""
+    def importar(modo):
+        proc = subprocess.run([sys.executable, "-c", _IMPORTAR, modulo, modo],
+                              capture_output=True, text=True, timeout=timeout, check=True)
+        tiempo, pico = proc.stdout.split()
+        return float(tiempo), int(pico)
+
+    tiempos = [importar("tiempo")[0] for _ in range(repeticiones)]
+    return _estadisticas(tiempos, importar("memoria")[1])
+
+
+def correr(repeticiones=5, timeout=60.0, filtro=None, log=sys.stderr):
+    ctx = mp.get_context()
+    casos = {}
+    for categoria, funciones in CORPUS.items():
+        for funcion in funciones:
+            nombre = f"{categoria}:{funcion}"
+            if filtro and filtro not in nombre:
+                continue
+            salida = ctx.Queue()
+            proc = ctx.Process(target=medir_caso, args=(funcion, repeticiones, salida), daemon=True)
+            t0 = time.monotonic()
+            proc.start()
+            fases = {}
+            while True:
+                restante = timeout - (time.monotonic() - t0)
+                try:
+                    item = salida.get(timeout=max(0.01, restante))
+                except queue.Empty:
+                    item = "tiempo_agotado"
+                if item is None:
+                    break
+                if item == "tiempo_agotado" or restante <= 0:
+                    fases["tiempo_agotado"] = True
+                    proc.terminate()
+                    break
+                fases[item[0]] = item[1]
+            proc.join(timeout=1.0)
+            casos[nombre] = fases
+            print(f"{nombre:55s} {time.monotonic() - t0:7.2f} s"
+                  + ("  (tiempo agotado)" if fases.get("tiempo_agotado") else ""), file=log)
+
+    for modulo in MODULOS_ARRANQUE:
+        nombre = f"arranque:{modulo}"
+        if filtro and filtro not in nombre:
+            continue
+        t0 = time.monotonic()
+        try:
+            casos[nombre] = {"import": medir_import(modulo, repeticiones, timeout)}
+        except subprocess.TimeoutExpired:
+            casos[nombre] = {"tiempo_agotado": True}
+        except subprocess.CalledProcessError as e:
+            casos[nombre] = {"error": e.stderr.strip().splitlines()[-1:]}
+        print(f"{nombre:55s} {time.monotonic() - t0:7.2f} s", file=log)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "sympy": __import__("sympy").__version__,
+            "repeticiones": repeticiones,
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "casos": casos,
+    }
+
+
+def _falla(fases):
+    """"tiempo_agotado" o "error" si el caso no terminó bien; None si terminó."""
+    for marca in ("tiempo_agotado", "error"):
+        if marca in fases:
+            return marca
+    return None
+
+
+def comparar(actual, base, umbral=1.25, minimo=0.002):
+    """
+    Lista (caso, fase, base, actual, razón) de las fases más lentas que
+    umbral×base. Diferencias de menos de `minimo` segundos se consideran ruido.
+
+    Un caso que ahora se pasa de tiempo o falla y en la base no, sale con
+    fase "tiempo_agotado" o "error" (base, actual y razón en None); una fase
+    de la base que ahora no aparece sale con actual y razón en None.
+    """
+    regresiones = []
+    for nombre, fases in actual["casos"].items():
+        fases_base = base["casos"].get(nombre)
+        if fases_base is None:
+            continue  # caso nuevo, sin nada con qué comparar
+        falla = _falla(fases)
+        if falla is not None and _falla(fases_base) is None:
+            regresiones.append((nombre, falla, None, None, None))
+            continue
+        for fase, stats_base in fases_base.items():
+            if not isinstance(stats_base, dict):
+                continue
+            stats = fases.get(fase)
+            if not isinstance(stats, dict):
+                regresiones.append((nombre, fase, stats_base["p50"], None, None))
+                continue
+            antes, ahora = stats_base["p50"], stats["p50"]
+            if antes > 0 and ahora / antes > umbral and ahora - antes > minimo:
+                regresiones.append((nombre, fase, antes, ahora, ahora / antes))
+    return regresiones
+
+
+def imprimir(reporte, archivo=sys.stdout):
+    print(f"{'caso':45s} {'fase':20s} {'p50 ms':>9s} {'p90 ms':>9s} {'pico KB':>9s}", file=archivo)
+    for nombre, fases in reporte["casos"].items():
+        for fase, s in fases.items():
+            if isinstance(s, dict):
+                print(f"{nombre[:45]:45s} {fase:20s} {s['p50'] * 1000:9.2f} "
+                      f"{s['p90'] * 1000:9.2f} {s['memoria_pico_kb']:9.1f}", file=archivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del analizador de funciones.")
+    parser.add_argument("-n", "--repeticiones", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="segundos máximos por función (todas sus fases)")
+    parser.add_argument("--filtro", default=None, help="solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--guardar", default=None, help="guardar el reporte JSON (línea base)")
+    parser.add_argument("--comparar", default=None, help="comparar contra un reporte JSON guardado")
+    parser.add_argument("--umbral", type=float, default=1.25,
+                        help="razón p50 actual/base a partir de la cual hay regresión")
+    parser.add_argument("--minimo-ms", type=float, default=2.0,
+                        help="diferencia mínima en ms para considerar una regresión")
+    args = parser.parse_args(argv)
+
+    reporte = correr(args.repeticiones, args.timeout, args.filtro)
+    imprimir(reporte)
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(reporte, base, args.umbral, args.minimo_ms / 1000)
+        for nombre, fase, antes, ahora, razon in regresiones:
+            if antes is None:
+                print(f"REGRESIÓN {nombre}: {fase.replace('_', ' ')} (en la línea base terminaba)")
+            elif ahora is None:
+                print(f"REGRESIÓN {nombre} [{fase}]: {antes * 1000:.2f} ms -> no se midió")
+            else:
+                print(f"REGRESIÓN {nombre} [{fase}]: {antes * 1000:.2f} ms -> {ahora * 1000:.2f} ms "
+                      f"(x{razon:.2f})")
+        if regresiones:
+            return 1
+        print("Sin regresiones respecto de la línea base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Se sube cuando cambia la forma de los resultados guardados: las entradas
+# viejas del disco dejan de coincidir en vez de devolver objetos de otra versión
+VERSION_FORMATO = 3
+
+
+def ruta_cache_por_defecto(nombre: str = "resultados.sqlite") -> str:
+    """Archivo dentro de la carpeta de caché del usuario (~/.cache en Linux)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "analizador_funciones", nombre)
+
+
+def carpeta_kernels(ruta_cache: str) -> str:
+    """Carpeta de kernels compilados junto al archivo de la caché de resultados."""
+    return os.path.join(os.path.dirname(ruta_cache), "kernels")
+
+
+class CacheResultados:
+    """
+    Caché de resultados del analizador.
+
+    La clave es la forma canónica (srepr) de la expresión ya parseada, así
+    que "x**2-1" y "-1 + x**2" caen en la misma entrada. Hay un LRU en
+    memoria acotado por cantidad de entradas y, si se indica `ruta`, un
+    respaldo en SQLite que sobrevive entre ejecuciones. Las entradas más
+    viejas que `max_edad` segundos se descartan al leerlas.
+    """
+
+    def __init__(self, max_entradas: int = 256, max_edad=None, ruta=None,
+                 max_entradas_disco: int = 5000):
+        self.max_entradas = max_entradas
+        self.max_edad = max_edad
+        self.max_entradas_disco = max_entradas_disco
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._escrituras = 0
+        self.hits = 0
+        self.hits_disco = 0
+        self.misses = 0
+        self.evictions = 0
+        if ruta:
+            self._abrir_disco(ruta)
+
+    # ---------- Disco ----------
+    def _abrir_disco(self, ruta: str):
+        try:
+            carpeta = os.path.dirname(ruta)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            self._db = sqlite3.connect(ruta, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " clave TEXT PRIMARY KEY, valor BLOB, creado REAL, usado REAL)"
+            )
+            self._db.commit()
+            self._purgar_disco()
+        except (sqlite3.Error, OSError):
+            # sin disco disponible seguimos solo en memoria
+            self._db = None
+
+    def _purgar_disco(self):
+        if self.max_edad is not None:
+            self._db.execute("DELETE FROM resultados WHERE creado < ?",
+                             (time.time() - self.max_edad,))
+        self._db.execute(
+            "DELETE FROM resultados WHERE clave NOT IN ("
+            " SELECT clave FROM resultados ORDER BY usado DESC LIMIT ?)",
+            (self.max_entradas_disco,)
+        )
+        self._db.commit()
+
+    # ---------- API ----------
+    def clave(self, operacion: str, expr, *extra) -> str:
+        # SymPy ya está cargado si hay una expresión: importarlo aquí deja
+        # abrir la caché sin pagar su import al arrancar
+        import sympy as sp
+        canon = f"v{VERSION_FORMATO}|{operacion}|{sp.srepr(expr)}|{'|'.join(map(str, extra))}"
+        return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+    def _vencida(self, creado: float) -> bool:
+        return self.max_edad is not None and time.time() - creado > self.max_edad
+
+    def obtener(self, clave: str):
+        """Devuelve (encontrado, valor)."""
+        with self._lock:
+            item = self._memoria.get(clave)
+            if item is not None:
+                valor, creado = item
+                if not self._vencida(creado):
+                    self._memoria.move_to_end(clave)
+                    self.hits += 1
+                    return True, valor
+                del self._memoria[clave]
+
+            if self._db is not None:
+                try:
+                    fila = self._db.execute(
+                        "SELECT valor, creado FROM resultados WHERE clave = ?", (clave,)
+                    ).fetchone()
+                    if fila is not None and not self._vencida(fila[1]):
+                        valor = pickle.loads(fila[0])
+                        self._db.execute("UPDATE resultados SET usado = ? WHERE clave = ?",
+                                         (time.time(), clave))
+                        self._db.commit()
+                        self._guardar_memoria(clave, valor, fila[1])
+                        self.hits += 1
+                        self.hits_disco += 1
+                        return True, valor
+                except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError):
+                    pass
+
+            self.misses += 1
+            return False, None
+
+    def _guardar_memoria(self, clave, valor, creado):
+        self._memoria[clave] = (valor, creado)
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_entradas:
+            self._memoria.popitem(last=False)
+            self.evictions += 1
+
+    def guardar(self, clave: str, valor):
+        ahora = time.time()
+        with self._lock:
+            self._guardar_memoria(clave, valor, ahora)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)",
+                        (clave, pickle.dumps(valor), ahora, ahora)
+                    )
+                    self._db.commit()
+                    # la purga es barata pero no hace falta en cada escritura
+                    self._escrituras += 1
+                    if self._escrituras % 50 == 0:
+                        self._purgar_disco()
+                except (sqlite3.Error, pickle.PicklingError, TypeError):
+                    pass
+
+    def limpiar(self):
+        with self._lock:
+            self._memoria.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM resultados")
+                self._db.commit()
+
+    def cerrar(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "hits_disco": self.hits_disco,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entradas_memoria": len(self._memoria),
+            "tasa_aciertos": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,235 @@
+"""
+Clasificación de la función y algoritmos rápidos por clase.
+
+La mayoría de las funciones de un curso son polinomios, racionales,
+radicales simples o composiciones con Abs/floor. Para esas no hace falta
+pasar por continuous_domain, function_range ni solveset genéricos:
+
+- polinomio / racional: raíces reales con Poly (aislamiento de raíces),
+  dominio = R menos los ceros del denominador, recorrido por puntos
+  críticos y límites en los polos y en ±∞.
+- radical: dominio por el signo de cada radicando (desigualdades
+  polinomiales).
+- por_partes (Abs, floor, ceiling de polinomios): dominio R.
+
+Lo que queda ("general") sigue por el camino genérico de SymPy.
+"""
+from collections import Counter
+
+import sympy as sp
+from sympy import S
+from sympy.solvers.inequalities import solve_poly_inequality
+
+_POR_PARTES = (sp.Abs, sp.floor, sp.ceiling)
+
+
+def _es_polinomio(expr, x) -> bool:
+    try:
+        return expr.is_polynomial(x)
+    except Exception:
+        return False
+
+
+def clasificar(expr, x) -> str:
+    """'polinomio', 'racional', 'radical', 'por_partes' o 'general'."""
+    if _es_polinomio(expr, x):
+        return "polinomio"
+    if expr.is_rational_function(x):
+        return "racional"
+    if expr.atoms(sp.Function) - expr.atoms(*_POR_PARTES):
+        return "general"
+    radicandos = _radicandos(expr, x)
+    if radicandos is None:
+        return "general"
+    if expr.atoms(*_POR_PARTES):
+        # Abs/floor de polinomios, sin raíces ni denominadores de por medio
+        if radicandos or not all(_es_polinomio(a.args[0], x) for a in expr.atoms(*_POR_PARTES)):
+            return "general"
+        if expr.as_numer_denom()[1].has(x):
+            return "general"
+        return "por_partes"
+    return "radical" if radicandos else "general"
+
+
+def _radicandos(expr, x):
+    """
+    Lista (base, exponente) de las potencias no enteras o negativas con x.
+    None si alguna base no es un polinomio (no es un radical simple).
+    """
+    salida = []
+    for p in expr.atoms(sp.Pow):
+        base, e = p.as_base_exp()
+        if not base.has(x):
+            if e.has(x):
+                return None  # exponencial a^x
+            continue
+        if not e.is_Rational or not _es_polinomio(base, x):
+            return None
+        if not e.is_Integer or e < 0:
+            salida.append((base, e))
+    return salida
+
+
+# ---------- Raíces ----------
+def raices_reales(poli, x):
+    """Raíces reales distintas de un polinomio, exactas (radicales o CRootOf), ordenadas."""
+    p = sp.Poly(poli, x)
+    if p.degree() <= 0:
+        return []
+    return sorted(set(p.real_roots()), key=lambda r: float(r))
+
+
+def raices_racional(expr, x):
+    """Raíces reales de p/q: ceros de p que no anulan q."""
+    # sin cancelar: una raíz de un factor común es un hueco, no una raíz
+    p, q = expr.as_numer_denom()
+    return [r for r in raices_reales(p, x) if q.subs(x, r) != 0]
+
+
+# ---------- Dominio ----------
+def _sin_puntos(puntos):
+    return S.Reals - sp.FiniteSet(*puntos) if puntos else S.Reals
+
+
+def dominio_rapido(expr, x, clase, ceros_denominador=()):
+    """Dominio para las clases con camino rápido; None si no aplica."""
+    if clase == "polinomio" or clase == "por_partes":
+        return S.Reals
+    if clase == "racional":
+        return _sin_puntos(ceros_denominador)
+    if clase == "radical":
+        dominio = _sin_puntos(ceros_denominador)
+        for base, e in _radicandos(expr, x):
+            poli = sp.Poly(base, x)
+            if e.is_Integer or e.q % 2 == 1:
+                # raíz impar: solo molesta si queda en un denominador
+                if e < 0:
+                    dominio -= sp.FiniteSet(*raices_reales(base, x))
+                continue
+            intervalos = solve_poly_inequality(poli, ">" if e < 0 else ">=")
+            dominio = dominio.intersect(sp.Union(*intervalos))
+        return dominio
+    return None
+
+
+# ---------- Recorrido ----------
+def _signo(valor) -> int:
+    v = float(valor)
+    return (v > 0) - (v < 0)
+
+
+def _horner(poli, xv: float) -> float:
+    """Evalúa el polinomio en float (Poly.eval en un radical es muy lento)."""
+    y = 0.0
+    for c in poli.all_coeffs():
+        y = y * xv + float(c)
+    return y
+
+
+def _limite_infinito(p, q, signo_x):
+    """lim p/q cuando x -> signo_x·∞ (por grados y coeficientes principales)."""
+    dp, dq = p.degree(), q.degree()
+    razon = p.LC() / q.LC()
+    if dp < dq:
+        return S.Zero
+    if dp == dq:
+        return razon
+    signo = _signo(razon) * (signo_x ** (dp - dq))
+    return S.Infinity if signo > 0 else S.NegativeInfinity
+
+
+def _limites_polo(p, q, a, m):
+    """(límite por izquierda, por derecha) de p/q en un polo a de orden m (gcd(p, q) = 1)."""
+    # cerca de a, q ~ q^(m)(a)/m! · (x - a)^m: eso da el signo a cada lado
+    af = float(a)
+    signo = _signo(_horner(p, af)) * _signo(_horner(q.diff((q.gen, m)), af))
+    derecha = signo
+    izquierda = signo * (-1) ** m
+    inf = lambda s: S.Infinity if s > 0 else S.NegativeInfinity
+    return inf(izquierda), inf(derecha)
+
+
+def recorrido_racional(expr, x):
+    """
+    Recorrido de un polinomio o función racional sin factores comunes.
+    En cada tramo entre polos f es continua, así que la imagen es el
+    intervalo entre el menor y el mayor de sus valores en puntos críticos y
+    sus límites en los bordes; un borde está incluido solo si se alcanza en
+    un punto crítico. Devuelve None si no aplica (p. ej. hay huecos).
+    """
+    # as_numer_denom no cancela factores comunes, así el gcd los ve
+    num, den = expr.as_numer_denom()
+    p, q = sp.Poly(num, x), sp.Poly(den, x)
+    if sp.gcd(p, q).degree() > 0:
+        return None  # discontinuidades evitables: mejor el camino genérico
+
+    # real_roots repite cada raíz según su multiplicidad
+    ordenes = Counter(q.real_roots()) if q.degree() > 0 else Counter()
+    polos = sorted(ordenes, key=float)
+    limites = {a: _limites_polo(p, q, a, m) for a, m in ordenes.items()}
+    criticos = raices_reales((p.diff(x) * q - p * q.diff(x)).as_expr(), x)
+    polos_f = set(float(a) for a in polos)
+    # valor en cada punto crítico: primero solo en float, el exacto se arma
+    # recién si termina siendo un extremo del recorrido
+    en_criticos = []
+    for c in criticos:
+        cf = float(c)
+        if cf not in polos_f:
+            en_criticos.append((cf, _horner(p, cf) / _horner(q, cf), c))
+
+    def exacto(c):
+        valor = num.subs(x, c) / den.subs(x, c)
+        if not valor.is_Rational and not valor.has(sp.CRootOf):
+            valor = sp.radsimp(sp.expand(num.subs(x, c)) / sp.expand(den.subs(x, c)))
+        return valor
+
+    bordes = [S.NegativeInfinity] + polos + [S.Infinity]
+    piezas = []
+    for izq, der in zip(bordes, bordes[1:]):
+        # (valor en float, valor exacto o punto crítico, alcanzado)
+        lim_izq = _limite_infinito(p, q, -1) if izq is S.NegativeInfinity else limites[izq][1]
+        lim_der = _limite_infinito(p, q, 1) if der is S.Infinity else limites[der][0]
+        candidatos = [(float(lim_izq), lim_izq, False), (float(lim_der), lim_der, False)]
+        fi, fd = float(izq), float(der)
+        candidatos += [(v, c, True) for xc, v, c in en_criticos if fi < xc < fd]
+        piezas.append(_intervalo_imagen(candidatos))
+    return _unir(piezas, exacto)
+
+
+def _intervalo_imagen(candidatos):
+    """
+    (min, max) de los candidatos como (float, exacto o punto crítico,
+    alcanzado); un extremo que solo es límite queda abierto.
+    """
+    def extremo(elegir):
+        objetivo = elegir(v for v, _, _ in candidatos)
+        iguales = [(e, alc) for v, e, alc in candidatos if v == objetivo]
+        alcanzados = [e for e, alc in iguales if alc]
+        if alcanzados:
+            return objetivo, alcanzados[0], True
+        return objetivo, iguales[0][0], False
+    return extremo(min), extremo(max)
+
+
+def _unir(piezas, exacto):
+    """
+    Une las imágenes de los tramos comparando en float; así SymPy no tiene
+    que comparar extremos algebraicos (CRootOf) y solo se calculan exactos
+    los extremos que quedan en el resultado.
+    """
+    piezas = sorted(piezas, key=lambda p: (p[0][0], not p[0][2]))
+    unidas = []
+    for lo, hi in piezas:
+        if unidas:
+            lo_u, hi_u = unidas[-1]
+            if lo[0] < hi_u[0] or (lo[0] == hi_u[0] and (lo[2] or hi_u[2])):
+                if hi[0] > hi_u[0] or (hi[0] == hi_u[0] and hi[2]):
+                    unidas[-1] = (lo_u, hi)
+                continue
+        unidas.append((lo, hi))
+
+    def valor(extremo):
+        _, e, alcanzado = extremo
+        return exacto(e) if alcanzado else e
+    return sp.Union(*(sp.Interval(valor(lo), valor(hi), not lo[2], not hi[2])
+                      for lo, hi in unidas))
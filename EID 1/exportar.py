@@ -0,0 +1,184 @@
+"""
+Exportación de las muestras de una curva a CSV o a un binario compacto.
+
+Las muestras se escriben a medida que salen de los generadores de
+muestreo (muestreo.bloques_uniformes / bloques_adaptativos), así que
+millones de puntos no pasan nunca por una lista completa.
+
+Formato binario (.eidm): una cabecera de 32 bytes
+
+    "EIDM", versión (uint16), columnas (uint16), n (uint64), 16 bytes libres
+
+seguida de n pares (x, y) en float64 little-endian. Un y NaN es un corte
+(sin valor o salto), igual que un y vacío en el CSV. leer_binario lo abre
+con mmap y devuelve vistas sin copiar, que matplotlib o NumPy usan tal cual.
+
+    python exportar.py "sin(50*x)" --desde -100 --hasta 100 -n 5000000 -o curva.eidm
+"""
+import argparse
+import csv
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+import muestreo
+
+MAGICO = b"EIDM"
+VERSION = 1
+_CABECERA = struct.Struct("<4sHHQ16x")
+
+
+def escribir_csv(bloques, destino, encabezado: bool = True) -> int:
+    """Escribe x,y por fila (y vacío en los cortes); devuelve la cantidad de filas."""
+    propio = isinstance(destino, str)
+    f = open(destino, "w", encoding="utf-8", newline="") if propio else destino
+    try:
+        escritor = csv.writer(f)
+        if encabezado:
+            escritor.writerow(("x", "y"))
+        n = 0
+        for xs, ys in bloques:
+            # csv escribe None como campo vacío y los float con repr (sin perder precisión)
+            escritor.writerows(zip(xs, ys))
+            n += len(xs)
+        return n
+    finally:
+        if propio:
+            f.close()
+
+
+def escribir_binario(bloques, ruta: str) -> int:
+    """Escribe el formato .eidm; devuelve la cantidad de puntos."""
+    nan = math.nan
+    n = 0
+    with open(ruta, "wb") as f:
+        # n se completa al final: al empezar todavía no se sabe
+        f.write(_CABECERA.pack(MAGICO, VERSION, 2, 0))
+        for xs, ys in bloques:
+            datos = array("d", [nan]) * (2 * len(xs))
+            datos[0::2] = array("d", xs)
+            datos[1::2] = array("d", [nan if y is None else y for y in ys])
+            if sys.byteorder == "big":
+                datos.byteswap()
+            datos.tofile(f)
+            n += len(xs)
+        f.seek(0)
+        f.write(_CABECERA.pack(MAGICO, VERSION, 2, n))
+    return n
+
+
+class CurvaBinaria:
+    """
+    Archivo .eidm mapeado en memoria. `xs` e `ys` son memoryview sobre el
+    archivo (sin copiar); hay que cerrarla (o usarla con `with`) para soltar
+    el mapeo.
+    """
+
+    def __init__(self, ruta: str):
+        with open(ruta, "rb") as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magico, version, columnas, n = _CABECERA.unpack_from(self._mapa)
+            if magico != MAGICO or version != VERSION or columnas != 2:
+                raise ValueError(f"{ruta} no es un archivo .eidm válido")
+            if len(self._mapa) < _CABECERA.size + 16 * n:
+                raise ValueError(f"{ruta} está truncado")
+        except (struct.error, ValueError):
+            self._mapa.close()
+            raise
+        self.n = n
+        datos = memoryview(self._mapa)[_CABECERA.size:_CABECERA.size + 16 * n].cast("d")
+        if sys.byteorder == "big":
+            # en big-endian no se puede evitar la copia
+            copia = array("d", datos)
+            datos.release()
+            copia.byteswap()
+            datos = memoryview(copia)
+        self._datos = datos
+        self.xs = datos[0::2]
+        self.ys = datos[1::2]
+
+    def puntos(self):
+        """(x, y) por punto, con None en los cortes."""
+        for x, y in zip(self.xs, self.ys):
+            yield x, (None if y != y else y)
+
+    def cerrar(self):
+        if self._mapa is None:
+            return
+        for vista in (self.xs, self.ys, self._datos):
+            vista.release()
+        self._mapa.close()
+        self._mapa = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return self.n
+
+
+def leer_binario(ruta: str) -> CurvaBinaria:
+    return CurvaBinaria(ruta)
+
+
+def leer_csv(ruta: str):
+    """Genera (x, y) desde un CSV exportado, con None en los cortes."""
+    with open(ruta, encoding="utf-8", newline="") as f:
+        filas = csv.reader(f)
+        for fila in filas:
+            if fila and fila[0] != "x":
+                yield float(fila[0]), (float(fila[1]) if fila[1] else None)
+
+
+def exportar(kernel, ruta: str, x_min: float, x_max: float, n: int = 100000,
+             criticos=(), y_clip=None, tramos: int = 0, formato=None) -> int:
+    """
+    Muestrea y escribe en `ruta` (CSV o .eidm según `formato` o la
+    extensión). Con `tramos` > 0 el muestreo es adaptativo por tramos en
+    lugar de una malla uniforme de n puntos. Devuelve la cantidad de puntos.
+    """
+    if tramos > 0:
+        bloques = muestreo.bloques_adaptativos(kernel, x_min, x_max, tramos, criticos, y_clip)
+    else:
+        bloques = muestreo.bloques_uniformes(kernel, x_min, x_max, n, criticos, y_clip)
+    formato = formato or ("csv" if ruta.lower().endswith(".csv") else "binario")
+    if formato == "csv":
+        return escribir_csv(bloques, ruta)
+    return escribir_binario(bloques, ruta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta las muestras de f(x) a CSV o .eidm.")
+    parser.add_argument("funcion")
+    parser.add_argument("-o", "--salida", required=True,
+                        help="archivo de salida (.csv o .eidm)")
+    parser.add_argument("--desde", type=float, default=-10.0)
+    parser.add_argument("--hasta", type=float, default=10.0)
+    parser.add_argument("-n", "--puntos", type=int, default=100000,
+                        help="puntos de la malla uniforme")
+    parser.add_argument("--tramos", type=int, default=0,
+                        help="muestreo adaptativo en esta cantidad de tramos (en vez de -n)")
+    parser.add_argument("--y-clip", type=float, default=None,
+                        help="|y| a partir del cual se considera corte")
+    args = parser.parse_args(argv)
+
+    from analisis_funciones import AnalizadorFunciones
+    sesion = AnalizadorFunciones(con_pasos=False).sesion(args.funcion)
+    if not sesion.valida:
+        print(sesion.error, file=sys.stderr)
+        return 1
+    # solo los puntos que el dominio excluye son cortes
+    n = exportar(sesion.kernel, args.salida, args.desde, args.hasta, args.puntos,
+                 sesion.excluidos_float, args.y_clip, args.tramos)
+    print(f"{n} puntos en {args.salida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Instrumentación del analizador: tiempos por fase, contadores y trazas.
+
+Cada proceso tiene un `registro` global. Las fases se miden con
+
+    with registro.fase("continuous_domain"):
+        ...
+
+y quedan acumuladas (cantidad, total, última, máxima) y como eventos de
+traza exportables a JSON o al formato de Chrome (chrome://tracing,
+Perfetto). La captura con cProfile/tracemalloc se activa con la variable
+de entorno ANALIZADOR_PERFIL=cprofile,tracemalloc o con --perfil en lote.py.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Registro:
+    def __init__(self, max_eventos: int = 20000):
+        self._lock = threading.Lock()
+        self.fases = {}           # nombre -> [cantidad, total, ultima, maxima]
+        self.contadores = {}
+        # ts en µs de perf_counter, que es un reloj monótono común a todos
+        # los procesos: las trazas de los hijos se alinean solas
+        self.eventos = deque(maxlen=max_eventos)
+
+    def registrar(self, nombre: str, duracion: float, inicio=None, pid=None):
+        if inicio is None:
+            inicio = time.perf_counter() - duracion
+        with self._lock:
+            st = self.fases.get(nombre)
+            if st is None:
+                st = self.fases[nombre] = [0, 0.0, 0.0, 0.0]
+            st[0] += 1
+            st[1] += duracion
+            st[2] = duracion
+            st[3] = max(st[3], duracion)
+            self.eventos.append({
+                "name": nombre, "ph": "X",
+                "ts": inicio * 1e6, "dur": duracion * 1e6,
+                "pid": pid or os.getpid(), "tid": threading.get_ident(),
+            })
+
+    @contextmanager
+    def fase(self, nombre: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nombre, time.perf_counter() - t0, t0)
+
+    def contar(self, nombre: str, n: int = 1):
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    # ---------- Entre procesos ----------
+    def tomar_eventos(self) -> dict:
+        """Vacía y devuelve eventos y contadores (para mandarlos desde un proceso hijo)."""
+        with self._lock:
+            detalle = {"eventos": list(self.eventos), "contadores": dict(self.contadores)}
+            self.eventos.clear()
+            self.contadores.clear()
+            return detalle
+
+    def incorporar(self, detalle):
+        """Suma a este registro lo que mandó otro proceso con tomar_eventos()."""
+        if not detalle:
+            return
+        for ev in detalle["eventos"]:
+            self.registrar(ev["name"], ev["dur"] / 1e6, ev["ts"] / 1e6, ev["pid"])
+        for nombre, n in detalle["contadores"].items():
+            self.contar(nombre, n)
+
+    # ---------- Consultas y exportación ----------
+    def instantanea(self) -> dict:
+        with self._lock:
+            return {
+                "fases": {n: {"cantidad": c, "total_s": t, "ultima_s": u, "maxima_s": m}
+                          for n, (c, t, u, m) in self.fases.items()},
+                "contadores": dict(self.contadores),
+            }
+
+    def resumen(self, nombres=None) -> str:
+        """Una línea con la última duración de cada fase y los aciertos de caché."""
+        with self._lock:
+            partes = [f"{n} {st[2] * 1000:.1f} ms" for n, st in self.fases.items()
+                      if nombres is None or n in nombres]
+            hits = self.contadores.get("cache_hits", 0)
+            total = hits + self.contadores.get("cache_misses", 0)
+        if total:
+            partes.append(f"caché {hits}/{total}")
+        return " · ".join(partes)
+
+    def exportar_json(self, ruta: str):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.instantanea(), f, indent=2, ensure_ascii=False)
+
+    def exportar_chrome(self, ruta: str):
+        with self._lock:
+            eventos = list(self.eventos)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f)
+
+    def reiniciar(self):
+        with self._lock:
+            self.fases.clear()
+            self.contadores.clear()
+            self.eventos.clear()
+
+
+registro = Registro()
+
+
+# ---------- Perfilado opcional ----------
+_perfil = {}
+
+
+def iniciar_perfil(modos, salida: str = "perfil_analizador"):
+    """modos: iterable con 'cprofile' y/o 'tracemalloc'."""
+    modos = {m.strip().lower() for m in modos if m.strip()}
+    if "cprofile" in modos and "cprofile" not in _perfil:
+        import cProfile
+        _perfil["cprofile"] = cProfile.Profile()
+        _perfil["cprofile"].enable()
+    if "tracemalloc" in modos and "tracemalloc" not in _perfil:
+        import tracemalloc
+        tracemalloc.start()
+        _perfil["tracemalloc"] = True
+    if _perfil:
+        _perfil["salida"] = salida
+        atexit.register(detener_perfil)
+
+
+def detener_perfil():
+    """Guarda lo capturado (<salida>.prof / <salida>.tracemalloc.txt)."""
+    salida = _perfil.pop("salida", "perfil_analizador")
+    prof = _perfil.pop("cprofile", None)
+    if prof is not None:
+        prof.disable()
+        prof.dump_stats(salida + ".prof")
+    if _perfil.pop("tracemalloc", None):
+        import tracemalloc
+        foto = tracemalloc.take_snapshot()
+        actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(salida + ".tracemalloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"actual {actual / 1024:.1f} KB, pico {pico / 1024:.1f} KB\n")
+            for st in foto.statistics("lineno")[:30]:
+                f.write(f"{st}\n")
+
+
+def activar_desde_entorno():
+    """Lee ANALIZADOR_PERFIL, ANALIZADOR_PERFIL_SALIDA y ANALIZADOR_TRAZA."""
+    modos = os.environ.get("ANALIZADOR_PERFIL", "")
+    if modos:
+        iniciar_perfil(modos.split(","), os.environ.get("ANALIZADOR_PERFIL_SALIDA",
+                                                        "perfil_analizador"))
+    traza = os.environ.get("ANALIZADOR_TRAZA")
+    if traza:
+        atexit.register(registro.exportar_chrome, traza)
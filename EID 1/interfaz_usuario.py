@@ -1,25 +1,116 @@
-from PyQt6 import QtWidgets, QtGui, QtCore
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 import math
-import sympy as sp
+import threading
+
+from PyQt6 import QtWidgets, QtGui, QtCore
+
+from cache_resultados import CacheResultados, carpeta_kernels, ruta_cache_por_defecto
+from instrumentacion import registro
+from trabajador import EjecutorAnalisis, FASES, contexto_procesos
+
+
+def _precalentar_modulos():
+    """
+    Hilo de arranque: importa SymPy, el analizador y matplotlib mientras la
+    ventana ya se ve. Cuando el hilo principal los pide, ya están cargados.
+    """
+    for nombre in ("analisis_funciones", "matplotlib.figure",
+                   "matplotlib.backends.backend_qtagg", "lienzo"):
+        with registro.fase(f"import:{nombre}"):
+            __import__(nombre)
 
-from analisis_funciones import AnalizadorFunciones
 
-class MplCanvas(FigureCanvas):
-    def __init__(self, parent=None):
-        self.fig = Figure(figsize=(6, 4), tight_layout=True)
-        self.ax = self.fig.add_subplot(111)
-        super().__init__(self.fig)
-        self.setParent(parent)
+def _separar_funciones(texto: str):
+    """Varias funciones separadas por ";" (modo comparación)."""
+    return [f.strip() for f in texto.split(";") if f.strip()]
+
+
+class _Comparada:
+    """Estado de una función extra en el modo comparación (f2, f3, ...)."""
+
+    def __init__(self, sesion, ejecutor):
+        self.sesion = sesion
+        self.ejecutor = ejecutor
+        self.eventos = {}
+        self.criticos = []
+        self.inters = {"y": None, "x": []}
+        self.punto = None
+
 
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Analizador de funciones")
         self.resize(1100, 680)
-        self.backend = AnalizadorFunciones()
+        # Análisis simbólico fuera del hilo de la interfaz. Los procesos se
+        # reinician y se agregan con hilos ya corriendo, así que no se hace
+        # fork de la ventana: salen del forkserver
+        self._ctx = contexto_procesos()
+        self.ejecutor = EjecutorAnalisis(ruta_cache=ruta_cache_por_defecto(), ctx=self._ctx)
+        self.ejecutor.precalentar()
+        # la evaluación en x va aparte: cambiar solo x no cancela el resto
+        self.ejecutor_eval = EjecutorAnalisis(ruta_cache=ruta_cache_por_defecto(), ctx=self._ctx)
+        self.ejecutor_eval.precalentar()
+        # modo comparación: un proceso más por cada función extra, en paralelo
+        self._ejecutores_extra = []
+        self._comparadas = []
+        self._funciones = []
+        self._cruces = []
+        self._backend = None
+        self._sesion = None
+        self._vstr = ""
+        self._eventos = {}
+        # Pan/zoom: vista actual (None = inicial) y muestreo por teselas;
+        # el lienzo y las teselas se crean cuando matplotlib termina de cargar
+        self._vista = None
+        self._teselas = None
+        self.canvas = None
         self._build_ui()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(50)
+        self._timer.timeout.connect(self._sondear)
+        # SymPy y matplotlib se importan en segundo plano
+        self._hilo_imports = threading.Thread(target=_precalentar_modulos, daemon=True)
+        self._hilo_imports.start()
+        self._timer_lienzo = QtCore.QTimer(self)
+        self._timer_lienzo.setInterval(50)
+        self._timer_lienzo.timeout.connect(self._esperar_modulos)
+        self._timer_lienzo.start()
+
+    @property
+    def backend(self):
+        # se crea al primer uso; si el hilo de arranque todavía está
+        # importando, el import espera a que termine
+        if self._backend is None:
+            from analisis_funciones import AnalizadorFunciones
+            from muestreo import CacheKernels
+            ruta = ruta_cache_por_defecto()
+            self._backend = AnalizadorFunciones(
+                cache=CacheResultados(ruta=ruta, max_edad=30 * 24 * 3600),
+                kernels=CacheKernels(carpeta=carpeta_kernels(ruta)),
+            )
+        return self._backend
+
+    def _esperar_modulos(self):
+        if self._hilo_imports.is_alive():
+            return
+        self._timer_lienzo.stop()
+        self._crear_lienzo()
+
+    def _crear_lienzo(self):
+        import muestreo
+        from lienzo import MplCanvas
+        with registro.fase("arranque.lienzo"):
+            self.canvas = MplCanvas(self)
+            self._lay_grafico.replaceWidget(self._placeholder, self.canvas)
+            self._placeholder.deleteLater()
+            self._placeholder = None
+            self.canvas.vista_cambiada.connect(self._on_vista)
+            self.canvas.vista_reiniciada.connect(self._on_vista_inicial)
+            self._teselas = muestreo.CacheTeselas()
+        if self._sesion is not None:
+            self._graficar()
+        self.lbl_perfil.setText(registro.resumen(
+            [n for n in registro.fases if n.startswith(("import:", "arranque."))]))
 
     # ---------- UI ----------
     def _build_ui(self):
@@ -35,7 +126,7 @@ class MainWindow(QtWidgets.QMainWindow):
         left.addLayout(form)
 
         self.ed_func = QtWidgets.QLineEdit()
-        self.ed_func.setPlaceholderText("Ej.: (x-1)/(x+2)  |  sqrt(x+1)  |  Abs(x)")
+        self.ed_func.setPlaceholderText("Ej.: (x-1)/(x+2)  |  sqrt(x+1)  |  comparar: x**2; sin(x); x**2 - sin(x)")
         self.ed_func.setClearButtonEnabled(True)
         form.addRow("Función f(x):", self.ed_func)
 
@@ -51,8 +142,22 @@ class MainWindow(QtWidgets.QMainWindow):
         left.addLayout(btn_row)
         self.btn_run = QtWidgets.QPushButton("Analizar y graficar")
         self.btn_clear = QtWidgets.QPushButton("Limpiar")
+        self.btn_exportar = QtWidgets.QPushButton("Exportar datos…")
+        self.btn_exportar.setToolTip("Guardar las muestras de la vista actual (CSV o binario .eidm)")
         btn_row.addWidget(self.btn_run)
         btn_row.addWidget(self.btn_clear)
+        btn_row.addWidget(self.btn_exportar)
+        self.chk_vivo = QtWidgets.QCheckBox("En vivo")
+        self.chk_vivo.setToolTip("Analizar mientras se escribe")
+        btn_row.addWidget(self.chk_vivo)
+
+        self.lbl_estado = QtWidgets.QLabel("")
+        left.addWidget(self.lbl_estado)
+        # tiempos de la última pasada por fase (sympify, solveset, dibujo...)
+        self.lbl_perfil = QtWidgets.QLabel("")
+        self.lbl_perfil.setWordWrap(True)
+        self.lbl_perfil.setStyleSheet("color: gray; font-size: 9pt;")
+        left.addWidget(self.lbl_perfil)
 
         self.out = QtWidgets.QTextEdit()
         self.out.setReadOnly(True)
@@ -63,99 +168,97 @@ class MainWindow(QtWidgets.QMainWindow):
         # Derecha: gráfico embebido
         right = QtWidgets.QVBoxLayout()
         root.addLayout(right, 4)
-        self.canvas = MplCanvas(self)
-        right.addWidget(self.canvas)
+        # hasta que carga matplotlib se muestra un aviso en lugar del gráfico
+        self._lay_grafico = right
+        self._placeholder = QtWidgets.QLabel("Cargando gráfico…")
+        self._placeholder.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        right.addWidget(self._placeholder)
 
         # Eventos
         self.btn_run.clicked.connect(self._run)
         self.btn_clear.clicked.connect(self._clear)
+        self.btn_exportar.clicked.connect(self._exportar)
+        self.ed_func.textChanged.connect(self._on_texto)
+        self.ed_x.textChanged.connect(self._on_texto)
+        # modo en vivo: se espera a que se deje de teclear
+        self._timer_vivo = QtCore.QTimer(self)
+        self._timer_vivo.setSingleShot(True)
+        self._timer_vivo.setInterval(350)
+        self._timer_vivo.timeout.connect(self._analizar_en_vivo)
+        # redibujo de la vista agrupado a ~30 cuadros por segundo
+        self._timer_vista = QtCore.QTimer(self)
+        self._timer_vista.setSingleShot(True)
+        self._timer_vista.setInterval(33)
+        self._timer_vista.timeout.connect(self._graficar)
 
     # ---------- Utilidades ----------
-    def _linspace(self, a: float, b: float, n: int):
-        if n < 2:
-            return [a]
-        step = (b - a) / (n - 1)
-        return [a + i * step for i in range(n)]
-
-    def _cluster_around(self, c: float, eps: float = 1e-3):
-        # puntos densos alrededor de c para dibujar cerca de asintotas/fronteras
-        return [c - 10*eps, c - 3*eps, c - eps, c - eps/3, c - eps/10,
-                c + eps/10, c + eps/3, c + eps, c + 3*eps, c + 10*eps]
-
-    def _plot_function(self, f_str: str, punto=None, inters=None,
-                       x_min=-10, x_max=10, base_pts=800, y_clip=50.0):
-        ax = self.canvas.ax
-        ax.clear()
-
-        # Preparar expresión
-        x = sp.Symbol('x', real=True)
-        try:
-            f = self.backend._sympify(f_str)
-        except Exception:
+    def _plot_function(self, f_str, punto=None, inters=None, criticos=None,
+                       x_min=-10, x_max=10, y_clip=50.0, vista=None):
+        import muestreo
+        # Preparar expresión (se reutiliza la sesión si ya viene parseada)
+        sesion = self.backend.sesion(f_str)
+        if not sesion.valida:
             raise ValueError("Función inválida.")
-
-        # Muestreo base + clusters en puntos críticos
-        xs = self._linspace(x_min, x_max, base_pts)
-        # Para asintotas se puede mejorar, de momento simple
-        xs = sorted(set(xs))
-
-        # Evaluación segura punto a punto
-        ys = []
-        for xv in xs:
-            try:
-                yv = f.subs(x, xv)
-                if yv.is_real is False:
-                    ys.append(None); continue
-                y = float(yv)
-                if not math.isfinite(y) or abs(y) > y_clip:
-                    ys.append(None)
-                else:
-                    ys.append(y)
-            except Exception:
-                ys.append(None)
-
-        # Trazo por segmentos (corta en None)
-        segx, segy = [], []
-        def flush(label_needed=False):
-            nonlocal segx, segy
-            if segx:
-                ax.plot(segx, segy, linewidth=2.0,
-                        label=f"f(x) = {f_str}" if label_needed else "")
-                segx, segy = [], []
-
-        first = True
-        for xv, yv in zip(xs, ys):
-            if yv is None:
-                flush(label_needed=first); first = False
-            else:
-                segx.append(xv); segy.append(yv)
-        flush(label_needed=first)
+        f_str = sesion.funcion_str
+        if vista is not None:
+            x_min, x_max, y_min, y_max = vista
+            # el recorte se agranda con la vista, en potencias de 2 para
+            # no invalidar las teselas en cada paso de zoom
+            alto = 2 * max(abs(y_min), abs(y_max))
+            if alto > y_clip:
+                y_clip = 2.0 ** math.ceil(math.log2(alto))
+
+        # Puntos críticos (c, excluido del dominio); si no vienen del
+        # proceso de análisis se calculan aquí
+        if criticos is None:
+            criticos = sesion.criticos
+
+        # Muestreo adaptativo con el kernel compilado (uno por sesión), por teselas: al
+        # desplazar o hacer zoom solo se muestrea lo que no estaba visto
+        comparadas = self._comparadas
+        with registro.fase("muestreo"):
+            m = self._teselas.muestrear(sesion.kernel, sesion.clave,
+                                        x_min, x_max, criticos=[c for c, _ in criticos],
+                                        y_clip=y_clip)
+            series = [(m.xs, m.ys)]
+            if comparadas:
+                # una sola malla para todas: la unión de las de cada curva,
+                # con el refinamiento de cada una cerca de sus puntos críticos
+                muestreos = [m] + [self._teselas.muestrear(
+                    c.sesion.kernel, c.sesion.clave, x_min, x_max,
+                    criticos=[x for x, _ in c.criticos], y_clip=y_clip) for c in comparadas]
+                kernels = [sesion.kernel] + [c.sesion.kernel for c in comparadas]
+                xs_comun, ys_curvas = muestreo.unir_muestreos(kernels, muestreos, y_clip)
+                series = [(xs_comun, ys_c) for ys_c in ys_curvas]
+        # a lo sumo un mínimo y un máximo por columna de píxel: el tiempo de
+        # dibujo no depende de cuántas muestras se tomaron
+        with registro.fase("diezmado"):
+            columnas = self.canvas.columnas()
+            curvas = [muestreo.diezmar(sx, sy, x_min, x_max, columnas) for sx, sy in series]
+        xs, ys = curvas[0]
 
         # Pintar asintotas verticales donde el dominio excluye el punto crítico
-        for c in critical:
-            ax.axvline(c, linewidth=0.8, linestyle=':', alpha=0.7)
-
-        # Intersecciones
-        if inters:
-            if inters.get("x"):
-                for i, xi in enumerate(inters["x"]):
-                    ax.plot([xi], [0.0], marker='o', markersize=6,
-                            label="Intersección X" if i == 0 else "")
-            if inters.get("y"):
-                ax.plot([inters["y"][0]], [inters["y"][1]], marker='o', markersize=6, label="Intersección Y")
-
-        # Punto evaluado en color distinto
-        if punto:
-            ax.plot([punto[0]], [punto[1]], marker='o', markersize=8, label=f"Punto ({punto[0]}, {punto[1]})")
-
-        ax.axhline(0, linewidth=0.8, linestyle='--')
-        ax.axvline(0, linewidth=0.8, linestyle='--')
-        ax.grid(True, which='both', linewidth=0.3)
-        ax.set_title("Gráfico")
-        ax.set_xlabel("X")
-        ax.set_ylabel("Y")
-        ax.legend()
-        self.canvas.draw()
+        todos = list(criticos) + [cr for c in comparadas for cr in c.criticos]
+        asintotas = sorted({c for c, excluido in todos if excluido and x_min <= c <= x_max})
+
+        extras, puntos_extra = [], []
+        if comparadas:
+            inters = {"y": inters.get("y"), "x": list(inters.get("x", []))}
+            for i, (c, (cx, cy)) in enumerate(zip(comparadas, curvas[1:]), start=2):
+                extras.append((cx, cy, f"f{i}(x) = {c.sesion.funcion_str}"))
+                inters["x"] += c.inters["x"]
+                if c.punto is not None:
+                    puntos_extra.append(c.punto)
+
+        # Los artistas del lienzo se reutilizan: solo se cambian sus datos
+        self.canvas.actualizar_grafico(
+            xs, ys, etiqueta=f"{'f1' if comparadas else 'f'}(x) = {f_str}", inters=inters,
+            punto=punto, asintotas=asintotas, xlim=(x_min, x_max),
+            ylim=(y_min, y_max) if vista is not None else None,
+            extras=extras,
+            cruces=[p for _, _, pts in self._cruces for p in pts if abs(p[1]) <= y_clip],
+            puntos_extra=puntos_extra,
+        )
 
     # ---------- Acciones ----------
     def _run(self):
@@ -166,62 +269,308 @@ class MainWindow(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "Entrada", "Ingresa la función.")
             return
 
-        # Analítica
-        dominio, pasos_dom = self.backend.calcular_dominio(fstr)
-        recorrido, pasos_rec = self.backend.calcular_recorrido(fstr)
-        inters_y, pasos_y, inters_x, pasos_x = self.backend.calcular_intersecciones(fstr)
-
-        inters_dict = {"y": None, "x": []}
-        if not isinstance(inters_y, str) and inters_y != "no existe":
-            try:
-                y_val = float(str(inters_y).strip("()").split(",")[1])
-                inters_dict["y"] = (0.0, y_val)
-            except Exception:
-                pass
-        if "Puntos:" in inters_x:
+        # El parseo es barato: se valida aquí para avisar de inmediato
+        sesiones = [self.backend.sesion(f) for f in _separar_funciones(fstr)]
+        for sesion in sesiones:
+            if not sesion.valida:
+                QtWidgets.QMessageBox.warning(self, "Entrada",
+                                              f"{sesion.funcion_str}: {sesion.error}")
+                return
+        self._iniciar(sesiones, vstr)
+
+    def _iniciar(self, sesiones, vstr):
+        # Lo simbólico corre en otro proceso; un clic nuevo cancela el anterior
+        sesion = sesiones[0]
+        self._funciones = [s.funcion_str for s in sesiones]
+        self._sesion = sesion
+        self._vstr = vstr
+        self._eventos = {}
+        self._inters_dict = {"y": None, "x": []}
+        self._punto = None
+        self._criticos = []
+        self._vista = None
+        self.ejecutor.iniciar(sesion.funcion_str, "",
+                              fases=[f for f in FASES if f != "evaluacion"])
+        if vstr:
+            self.ejecutor_eval.iniciar(sesion.funcion_str, vstr, fases=("evaluacion",))
+        else:
+            self.ejecutor_eval.cancelar()
+        self._iniciar_comparadas(sesiones[1:], vstr)
+        self.lbl_estado.setText("Analizando...")
+        self._mostrar_resultados()
+        self._graficar()
+        self._timer.start()
+
+    def _iniciar_comparadas(self, sesiones, vstr):
+        """Funciones extra: cada una en su propio proceso, todas a la vez."""
+        for c in self._comparadas:
+            c.ejecutor.cancelar()
+        while len(self._ejecutores_extra) < len(sesiones):
+            ejecutor = EjecutorAnalisis(ruta_cache=ruta_cache_por_defecto(), ctx=self._ctx)
+            ejecutor.precalentar()
+            self._ejecutores_extra.append(ejecutor)
+        self._comparadas = [_Comparada(s, ej) for s, ej in zip(sesiones, self._ejecutores_extra)]
+        for c in self._comparadas:
+            c.ejecutor.iniciar(c.sesion.funcion_str, "",
+                               fases=[f for f in FASES if f != "evaluacion"])
+        self._cruces = []
+        if self._comparadas:
+            import raices
+            todas = [self._sesion] + sesiones
+            with registro.fase("cruces"):
+                for i in range(len(todas)):
+                    for j in range(i + 1, len(todas)):
+                        puntos = raices.intersecciones_curvas(todas[i].kernel, todas[j].kernel)
+                        self._cruces.append((i, j, puntos))
+        self._evaluar_comparadas(vstr)
+
+    def _evaluar_comparadas(self, vstr):
+        # en las funciones extra el punto sale del kernel (sin paso a paso)
+        for c in self._comparadas:
+            c.punto = None
+            if not vstr:
+                continue
             try:
-                puntos = inters_x.replace("Puntos:", "").split(",")
-                inters_dict["x"] = [float(p.strip("() ").split(",")[0]) for p in puntos]
-            except Exception:
-                pass
+                xv = self.backend._to_float(vstr)
+            except (ValueError, ZeroDivisionError):
+                continue
+            y = c.sesion.kernel(xv)
+            if y is not None and math.isfinite(y):
+                c.punto = (xv, y)
+
+    def _on_texto(self):
+        if self.chk_vivo.isChecked():
+            self._timer_vivo.start()
+
+    def _analizar_en_vivo(self):
+        fstr = self.ed_func.text().strip()
+        vstr = self.ed_x.text().strip()
+        if not fstr:
+            return
+        if self._sesion is not None and _separar_funciones(fstr) == self._funciones:
+            # misma función: solo se recalcula la evaluación y el punto
+            if vstr != self._vstr and (not vstr or self.ed_x.hasAcceptableInput()):
+                self._evaluar(vstr)
+            return
+        sesiones = [self.backend.sesion(f) for f in _separar_funciones(fstr)]
+        for sesion in sesiones:
+            if not sesion.valida:
+                # mientras se escribe no se interrumpe con diálogos
+                self.lbl_estado.setText(f"Esperando una función válida ({sesion.error})")
+                return
+        if vstr and not self.ed_x.hasAcceptableInput():
+            vstr = ""
+        self._iniciar(sesiones, vstr)
+
+    def _evaluar(self, vstr):
+        self._vstr = vstr
+        self._punto = None
+        self._eventos.pop("evaluacion", None)
+        if vstr:
+            self.ejecutor_eval.iniciar(self._sesion.funcion_str, vstr, fases=("evaluacion",))
+            self.lbl_estado.setText("Evaluando...")
+            self._timer.start()
+        else:
+            self.ejecutor_eval.cancelar()
+        self._evaluar_comparadas(vstr)
+        self._mostrar_resultados()
+        self._graficar()
+
+    def _sondear(self):
+        redibujar = False
+        for ev in self.ejecutor.sondear() + self.ejecutor_eval.sondear():
+            self._eventos[ev.fase] = ev
+            if ev.estado != "ok":
+                continue
+            if ev.fase == "criticos":
+                self._criticos = ev.resultado
+                redibujar = True
+            elif ev.fase == "intersecciones":
+                self._inters_dict = self._marcas_intersecciones(ev.resultado)
+                redibujar = True
+            elif ev.fase == "evaluacion" and ev.resultado and ev.resultado.ok:
+                self._punto = (ev.resultado.x.numero, ev.resultado.y.numero)
+                redibujar = True
+        for i, c in enumerate(self._comparadas, start=2):
+            for ev in c.ejecutor.sondear():
+                c.eventos[ev.fase] = ev
+                if ev.estado != "ok":
+                    continue
+                if ev.fase == "criticos":
+                    c.criticos = ev.resultado
+                    redibujar = True
+                elif ev.fase == "intersecciones":
+                    c.inters = self._marcas_intersecciones(ev.resultado)
+                    redibujar = True
+
+        if self._eventos or self._comparadas:
+            self._mostrar_resultados()
+        if redibujar:
+            self._graficar()
+        ocupados = [self.ejecutor, self.ejecutor_eval] + [c.ejecutor for c in self._comparadas]
+        if not any(ej.ocupado for ej in ocupados):
+            self._timer.stop()
+            agotadas = [f for f, ev in self._eventos.items() if ev.estado == "tiempo_agotado"]
+            agotadas += [f"{f} (f{i})" for i, c in enumerate(self._comparadas, start=2)
+                         for f, ev in c.eventos.items() if ev.estado == "tiempo_agotado"]
+            if agotadas:
+                self.lbl_estado.setText("Listo (tiempo agotado en: " + ", ".join(agotadas) + ")")
+            else:
+                self.lbl_estado.setText("Listo")
+            self.lbl_perfil.setText(registro.resumen())
 
-        # Paso a paso en la salida
+    def _marcas_intersecciones(self, inters):
+        # los valores ya vienen en float: no hay que reparsear el texto
+        inters_dict = {"y": None, "x": []}
+        if inters.y is not None and inters.y.numero is not None:
+            inters_dict["y"] = (0.0, inters.y.numero)
+        inters_dict["x"] = [r.numero for r in inters.x if r.numero is not None]
+        return inters_dict
+
+    def _pasos_fase(self, fase, campo="pasos", texto="texto", eventos=None):
+        """
+        Líneas de una fase según su estado: pendiente, agotada, error u ok.
+        Con campo=None solo el resultado, sin paso a paso.
+        """
+        ev = (self._eventos if eventos is None else eventos).get(fase)
+        if ev is None:
+            return ["(calculando...)"]
+        if ev.estado == "tiempo_agotado":
+            return [f"(tiempo agotado: se superaron {self.ejecutor.presupuestos[fase]:.0f} s)"]
+        if ev.estado == "error":
+            return [f"Error: {ev.resultado}"]
+        pasos = getattr(ev.resultado, campo) if campo else None
+        return list(pasos) if pasos else [getattr(ev.resultado, texto)]
+
+    def _mostrar_resultados(self):
+        # Paso a paso en la salida, a medida que llegan las fases
         lines = []
+        if self._comparadas:
+            lines.append(f"##### f1(x) = {self._sesion.funcion_str} #####")
         lines.append("=== Dominio ===")
-        lines.extend(pasos_dom)
-        lines.append("") 
+        lines.extend(self._pasos_fase("dominio"))
+        lines.append("")
         lines.append("=== Recorrido ===")
-        lines.extend(pasos_rec)
+        lines.extend(self._pasos_fase("recorrido"))
         lines.append("")
         lines.append("=== Intersección con eje Y ===")
-        lines.extend(pasos_y)
+        lines.extend(self._pasos_fase("intersecciones", "pasos_y", "texto_y"))
         lines.append("")
         lines.append("=== Intersecciones con eje X ===")
-        lines.extend(pasos_x)
+        lines.extend(self._pasos_fase("intersecciones", "pasos_x", "texto_x"))
 
-        punto = None
-        if vstr:
-            res = self.backend.evaluar_funcion(fstr, vstr)
+        if self._vstr:
             lines.append("\n--- Evaluación ---")
-            lines.extend(res.get("steps", []))
-            if res.get("ok"):
-                lines.append(f"Par ordenado: ({res['x_num']}, {res['value']})")
-                punto = (res['x_num'], res['value'])
+            ev = self._eventos.get("evaluacion")
+            if ev is None or ev.estado != "ok":
+                lines.extend(self._pasos_fase("evaluacion"))
             else:
-                lines.append(res.get("error", "Error en evaluación."))
+                res = ev.resultado
+                lines.extend(res.pasos or [])
+                if res.ok:
+                    lines.append(f"Par ordenado: ({res.x.numero}, {res.y.numero})")
+                else:
+                    lines.append(res.error or "Error en evaluación.")
 
-        self.out.clear()
+        if self._comparadas:
+            lines.extend(self._lineas_comparacion())
         self.out.setPlainText("\n".join(lines))
 
-        # Gráfico
+    def _lineas_comparacion(self):
+        lines = []
+        for i, c in enumerate(self._comparadas, start=2):
+            lines.append("")
+            lines.append(f"##### f{i}(x) = {c.sesion.funcion_str} #####")
+            for titulo, fase, texto in (("Dominio", "dominio", "texto"),
+                                        ("Recorrido", "recorrido", "texto"),
+                                        ("Intersección Y", "intersecciones", "texto_y"),
+                                        ("Intersecciones X", "intersecciones", "texto_x")):
+                lines.append(f"{titulo}: " + " ".join(self._pasos_fase(fase, None, texto,
+                                                                        c.eventos)))
+            if self._vstr:
+                valor = f"{c.punto[1]:.10g}" if c.punto else "no definida"
+                lines.append(f"f{i}({self._vstr}) ≈ {valor}")
+        lines.append("")
+        lines.append("=== Cortes entre curvas (aprox., x en [-10, 10]) ===")
+        for i, j, puntos in self._cruces:
+            texto = ", ".join(f"({x:.6g}, {y:.6g})" for x, y in puntos) or "no se cortan"
+            lines.append(f"f{i + 1} y f{j + 1}: {texto}")
+        return lines
+
+    def _graficar(self):
+        if self.canvas is None:
+            return
         try:
-            self._plot_function(fstr, punto=punto, inters=inters_dict)
+            self._plot_function(self._sesion, punto=self._punto, inters=self._inters_dict,
+                                criticos=self._criticos, vista=self._vista)
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Gráfico", f"No se pudo graficar: {e}")
 
+    def _exportar(self):
+        if self._sesion is None:
+            QtWidgets.QMessageBox.information(self, "Exportar", "Primero analiza una función.")
+            return
+        ruta, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Exportar muestras", "curva.csv", "CSV (*.csv);;Binario float64 (*.eidm)")
+        if not ruta:
+            return
+        n, ok = QtWidgets.QInputDialog.getInt(self, "Exportar muestras", "Cantidad de puntos:",
+                                              100000, 2, 50_000_000)
+        if not ok:
+            return
+        import exportar
+        # se exporta lo que se está viendo, con la resolución pedida
+        x_min, x_max = self._vista[:2] if self._vista is not None else (-10.0, 10.0)
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.CursorShape.WaitCursor)
+        try:
+            with registro.fase("exportar"):
+                total = exportar.exportar(self._sesion.kernel, ruta, x_min, x_max, n,
+                                          criticos=[c for c, excluido in self._criticos if excluido])
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Exportar", f"No se pudo guardar: {e}")
+            return
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        self.lbl_estado.setText(f"Exportados {total} puntos a {ruta}")
+
+    def _on_vista(self, x_min, x_max, y_min, y_max):
+        if self._sesion is None or not (x_max > x_min and y_max > y_min):
+            return
+        self._vista = (x_min, x_max, y_min, y_max)
+        if not self._timer_vista.isActive():
+            self._timer_vista.start()
+
+    def _on_vista_inicial(self):
+        if self._sesion is None:
+            return
+        self._vista = None
+        self._graficar()
+
+    def closeEvent(self, event):
+        self._timer.stop()
+        self._timer_vivo.stop()
+        self.ejecutor.cerrar()
+        self.ejecutor_eval.cerrar()
+        for ejecutor in self._ejecutores_extra:
+            ejecutor.cerrar()
+        super().closeEvent(event)
+
     def _clear(self):
+        self._timer_vivo.stop()
+        self.ejecutor.cancelar()
+        self.ejecutor_eval.cancelar()
+        for c in self._comparadas:
+            c.ejecutor.cancelar()
+        self._comparadas = []
+        self._funciones = []
+        self._cruces = []
+        self._sesion = None
+        self._vista = None
+        self._timer.stop()
+        self.lbl_estado.setText("")
+        self.lbl_perfil.setText("")
         self.ed_func.clear()
         self.ed_x.clear()
         self.out.clear()
-        self.canvas.ax.clear()
-        self.canvas.draw()
+        if self.canvas is not None:
+            self.canvas.limpiar()
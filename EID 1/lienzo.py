@@ -0,0 +1,189 @@
+"""
+Lienzo de matplotlib embebido en la ventana.
+
+Está aparte de interfaz_usuario para que matplotlib (lo más lento de
+importar) se cargue recién cuando la ventana ya está en pantalla.
+"""
+from PyQt6 import QtCore
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+
+from instrumentacion import registro
+
+
+class MplCanvas(FigureCanvas):
+    # (x_min, x_max, y_min, y_max) pedidos al arrastrar o usar la rueda
+    vista_cambiada = QtCore.pyqtSignal(float, float, float, float)
+    # doble clic: volver a la vista inicial
+    vista_reiniciada = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        self.fig = Figure(figsize=(6, 4), tight_layout=True)
+        self.ax = self.fig.add_subplot(111)
+        super().__init__(self.fig)
+        self.setParent(parent)
+        self._arrastre = None
+        self._crear_artistas()
+        self.mpl_connect('draw_event', self._on_draw)
+        self.mpl_connect('scroll_event', self._on_scroll)
+        self.mpl_connect('button_press_event', self._on_press)
+        self.mpl_connect('motion_notify_event', self._on_motion)
+        self.mpl_connect('button_release_event', self._on_release)
+
+    # ---------- Artistas persistentes y blitting ----------
+    def _crear_artistas(self):
+        ax = self.ax
+        ax.axhline(0, linewidth=0.8, linestyle='--')
+        ax.axvline(0, linewidth=0.8, linestyle='--')
+        ax.grid(True, which='both', linewidth=0.3)
+        ax.set_title("Gráfico")
+        ax.set_xlabel("X")
+        ax.set_ylabel("Y")
+        # Los artistas dinámicos son "animated": no entran en el fondo
+        # cacheado y se dibujan encima con blit
+        self.curva, = ax.plot([], [], linewidth=2.0, animated=True)
+        self.marcas_x, = ax.plot([], [], marker='o', markersize=6, linestyle='none', animated=True)
+        self.marca_y, = ax.plot([], [], marker='o', markersize=6, linestyle='none', animated=True)
+        self.punto, = ax.plot([], [], marker='o', markersize=8, linestyle='none', animated=True)
+        # asíntotas: x en datos, y en coordenadas de ejes (de abajo a arriba)
+        self.asintotas, = ax.plot([], [], linewidth=0.8, linestyle=':', alpha=0.7, color='gray',
+                                  transform=ax.get_xaxis_transform(), animated=True)
+        # cortes entre curvas (modo comparación)
+        self.cruces, = ax.plot([], [], marker='x', markersize=8, linestyle='none', color='black',
+                               animated=True)
+        self._animados = [self.asintotas, self.curva, self.marcas_x, self.marca_y, self.punto,
+                          self.cruces]
+        # curvas de las funciones comparadas: se crean a medida que hacen falta
+        # y después solo se les cambian los datos
+        self.curvas_extra = []
+        self._fondo = None
+        self._limites = None
+        self._etiquetas = ()
+
+    def draw(self):
+        with registro.fase("canvas.draw"):
+            super().draw()
+
+    def _on_draw(self, event):
+        self._fondo = self.copy_from_bbox(self.fig.bbox)
+        for a in self._animados:
+            self.ax.draw_artist(a)
+
+    def _refrescar(self):
+        limites = (tuple(self.ax.get_xlim()), tuple(self.ax.get_ylim()))
+        etiquetas = tuple(a.get_label() for a in self._animados)
+        if self._fondo is None or limites != self._limites or etiquetas != self._etiquetas:
+            # cambian ejes o leyenda: hace falta un dibujo completo
+            self._limites, self._etiquetas = limites, etiquetas
+            handles = [a for a in self._animados if not a.get_label().startswith('_')]
+            if handles:
+                self.ax.legend(handles=handles)
+            elif self.ax.get_legend() is not None:
+                self.ax.get_legend().remove()
+            self.draw_idle()
+            return
+        # solo cambiaron datos: fondo cacheado + artistas dinámicos
+        with registro.fase("canvas.blit"):
+            self.restore_region(self._fondo)
+            for a in self._animados:
+                self.ax.draw_artist(a)
+            self.blit(self.fig.bbox)
+
+    def columnas(self) -> int:
+        """Ancho de los ejes en píxeles del dispositivo (columnas que se llegan a ver)."""
+        return max(1, int(self.ax.bbox.width))
+
+    def _curva_extra(self, i):
+        while len(self.curvas_extra) <= i:
+            linea, = self.ax.plot([], [], linewidth=1.6, animated=True)
+            self.curvas_extra.append(linea)
+            self._animados.insert(1 + len(self.curvas_extra), linea)
+        return self.curvas_extra[i]
+
+    def actualizar_grafico(self, xs, ys, etiqueta="", inters=None, punto=None,
+                           asintotas=(), xlim=None, ylim=None, extras=(), cruces=(),
+                           puntos_extra=()):
+        """
+        extras: (xs, ys, etiqueta) de otras curvas; cruces: (x, y) donde se
+        cortan; puntos_extra: (x, y) evaluados en las otras curvas.
+        """
+        nan = float('nan')
+        # una sola línea: los None (huecos) pasan a NaN y matplotlib la corta ahí
+        self.curva.set_data(xs, [nan if y is None else y for y in ys])
+        self.curva.set_label(etiqueta if xs else "_curva")
+        for i, (exs, eys, eetiqueta) in enumerate(extras):
+            linea = self._curva_extra(i)
+            linea.set_data(exs, [nan if y is None else y for y in eys])
+            linea.set_label(eetiqueta if exs else f"_extra{i}")
+        for i in range(len(extras), len(self.curvas_extra)):
+            self.curvas_extra[i].set_data([], [])
+            self.curvas_extra[i].set_label(f"_extra{i}")
+        self.cruces.set_data([c[0] for c in cruces], [c[1] for c in cruces])
+        self.cruces.set_label("Cortes entre curvas" if cruces else "_cruces")
+
+        xi = (inters or {}).get("x") or []
+        self.marcas_x.set_data(xi, [0.0] * len(xi))
+        self.marcas_x.set_label("Intersección X" if xi else "_marcas_x")
+        yi = (inters or {}).get("y")
+        self.marca_y.set_data([yi[0]], [yi[1]]) if yi else self.marca_y.set_data([], [])
+        self.marca_y.set_label("Intersección Y" if yi else "_marca_y")
+
+        if punto:
+            self.punto.set_data([punto[0]] + [p[0] for p in puntos_extra],
+                                [punto[1]] + [p[1] for p in puntos_extra])
+            self.punto.set_label(f"Punto ({punto[0]}, {punto[1]})")
+        elif puntos_extra:
+            self.punto.set_data([p[0] for p in puntos_extra], [p[1] for p in puntos_extra])
+            self.punto.set_label("_punto")
+        else:
+            self.punto.set_data([], [])
+            self.punto.set_label("_punto")
+
+        ax_x, ax_y = [], []
+        for c in asintotas:
+            ax_x += [c, c, nan]
+            ax_y += [0.0, 1.0, nan]
+        self.asintotas.set_data(ax_x, ax_y)
+
+        if xlim is not None:
+            self.ax.set_xlim(xlim)
+        if ylim is not None:
+            self.ax.set_ylim(ylim)
+        else:
+            self.ax.relim()
+            self.ax.set_autoscaley_on(True)
+            self.ax.autoscale_view(scalex=False)
+        self._refrescar()
+
+    def limpiar(self):
+        self.actualizar_grafico([], [])
+
+    def _on_scroll(self, event):
+        if event.inaxes is not self.ax:
+            return
+        # zoom centrado en el cursor
+        factor = 0.8 if event.button == 'up' else 1.25
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        cx, cy = event.xdata, event.ydata
+        self.vista_cambiada.emit(cx + (x0 - cx) * factor, cx + (x1 - cx) * factor,
+                                 cy + (y0 - cy) * factor, cy + (y1 - cy) * factor)
+
+    def _on_press(self, event):
+        if event.inaxes is not self.ax or event.button != 1:
+            return
+        if event.dblclick:
+            self.vista_reiniciada.emit()
+            return
+        self._arrastre = (event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim())
+
+    def _on_motion(self, event):
+        if self._arrastre is None:
+            return
+        # en píxeles: xdata cambia a medida que se mueven los límites
+        px, py, (x0, x1), (y0, y1) = self._arrastre
+        dx = (event.x - px) * (x1 - x0) / self.ax.bbox.width
+        dy = (event.y - py) * (y1 - y0) / self.ax.bbox.height
+        self.vista_cambiada.emit(x0 - dx, x1 - dx, y0 - dy, y1 - dy)
+
+    def _on_release(self, event):
+        self._arrastre = None
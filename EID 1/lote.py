@@ -0,0 +1,209 @@
+"""
+Modo por lotes (sin interfaz gráfica).
+
+Lee funciones de un archivo (o de la entrada estándar), una por línea o en
+JSONL ({"funcion": "...", "x": ["1", "2"]}), y las analiza en paralelo en
+varios procesos. Escribe un JSON por función en la salida estándar y un
+resumen con el rendimiento en la salida de errores.
+
+    python lote.py ejercicios.txt --x 2 --x 1/2 > resultados.jsonl
+
+Con --traza se guarda una traza de las fases internas (sympify,
+continuous_domain, solveset, ...) de todos los procesos, para abrir en
+chrome://tracing o Perfetto; con --metricas, los tiempos acumulados en JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import instrumentacion
+from instrumentacion import registro
+from trabajador import EjecutorAnalisis, FASES
+
+
+def leer_entradas(archivo):
+    """Genera (funcion, lista_x) por cada línea útil del archivo."""
+    for linea in archivo:
+        linea = linea.strip()
+        if not linea or linea.startswith("#"):
+            continue
+        if linea.startswith("{"):
+            try:
+                dato = json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield None, f"JSON inválido: {e}"
+                continue
+            xs = dato.get("x", [])
+            if not isinstance(xs, list):
+                xs = [xs]
+            yield dato.get("funcion", dato.get("f", "")), [str(v) for v in xs]
+        else:
+            yield linea, []
+
+
+def armar_resultado(indice, funcion, xs, eventos, con_pasos=False):
+    res = {"indice": indice, "funcion": funcion, "estado": {}, "duracion": {}}
+    for fase, ev in eventos.items():
+        res["estado"][fase] = ev.estado
+        res["duracion"][fase] = round(ev.duracion, 4)
+        if ev.estado == "error":
+            res.setdefault("errores", {})[fase] = str(ev.resultado)
+        if ev.estado != "ok" or ev.resultado is None:
+            continue
+        r = ev.resultado
+        if fase == "evaluacion":
+            evals = []
+            for e in r:
+                item = e.a_json()
+                if con_pasos:
+                    item["pasos"] = list(e.pasos or [])
+                evals.append(item)
+            res["evaluaciones"] = evals
+            continue
+        if fase == "muestreo":
+            res["muestreo"] = {"xs": r.xs, "ys": r.ys, "cortes": r.cortes,
+                               "evaluaciones": r.evaluaciones}
+            continue
+        if r.error:
+            res.setdefault("errores", {})[fase] = r.error
+            continue
+        # los resultados ya vienen tipados: se serializan sin reparsear texto
+        res.update(r.a_json())
+        if con_pasos:
+            if fase == "intersecciones":
+                res["pasos_y"], res["pasos_x"] = list(r.pasos_y), list(r.pasos_x)
+            else:
+                res[f"pasos_{fase}"] = list(r.pasos)
+    return res
+
+
+def procesar(entradas, procesos, timeout, orden="entrada", con_pasos=False,
+             ruta_cache=None, salida=sys.stdout):
+    """
+    Reparte las entradas entre `procesos` ejecutores y va escribiendo los
+    resultados. Devuelve un diccionario con las estadísticas del lote.
+    """
+    fases = [f for f in FASES if f != "criticos"]
+    presupuestos = {f: timeout for f in fases}
+    libres = [EjecutorAnalisis(presupuestos=presupuestos, ruta_cache=ruta_cache,
+                               con_pasos=con_pasos)
+              for _ in range(procesos)]
+    for ej in libres:
+        ej.precalentar()
+    en_curso = {}          # ejecutor -> (indice, funcion, xs, eventos)
+    pendientes = {}        # indice -> resultado (para respetar el orden de entrada)
+    siguiente = 0
+    stats = {"items": 0, "ok": 0, "fallidos": 0, "tiempo_agotado": 0}
+    t0 = time.perf_counter()
+    entradas = enumerate(entradas)
+    agotadas = False
+
+    def emitir(res):
+        stats["items"] += 1
+        estados = res["estado"].values()
+        if "tiempo_agotado" in estados:
+            stats["tiempo_agotado"] += 1
+        if res.get("errores"):
+            stats["fallidos"] += 1
+        elif "tiempo_agotado" not in estados:
+            stats["ok"] += 1
+        salida.write(json.dumps(res, ensure_ascii=False) + "\n")
+
+    def terminar(res):
+        nonlocal siguiente
+        if orden == "llegada":
+            emitir(res)
+            return
+        pendientes[res["indice"]] = res
+        while siguiente in pendientes:
+            emitir(pendientes.pop(siguiente))
+            siguiente += 1
+
+    try:
+        while True:
+            # repartir trabajo a los ejecutores libres
+            while libres and not agotadas:
+                try:
+                    indice, (funcion, xs) = next(entradas)
+                except StopIteration:
+                    agotadas = True
+                    break
+                if funcion is None:
+                    terminar({"indice": indice, "funcion": None, "estado": {},
+                              "duracion": {}, "errores": {"entrada": xs}})
+                    continue
+                ej = libres.pop()
+                ej.iniciar(funcion, xs, fases=fases)
+                en_curso[ej] = (indice, funcion, xs, {})
+
+            if not en_curso and agotadas:
+                break
+
+            for ej in list(en_curso):
+                indice, funcion, xs, eventos = en_curso[ej]
+                for ev in ej.sondear():
+                    eventos[ev.fase] = ev
+                if not ej.ocupado:
+                    del en_curso[ej]
+                    libres.append(ej)
+                    terminar(armar_resultado(indice, funcion, xs, eventos, con_pasos))
+            salida.flush()
+            time.sleep(0.005)
+    finally:
+        for ej in libres + list(en_curso):
+            ej.cerrar()
+
+    stats["segundos"] = round(time.perf_counter() - t0, 3)
+    stats["items_por_segundo"] = round(stats["items"] / stats["segundos"], 2) if stats["segundos"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analiza funciones por lotes, sin interfaz gráfica.")
+    parser.add_argument("entrada", nargs="?", default="-",
+                        help="archivo con una función por línea o JSONL (por defecto, stdin)")
+    parser.add_argument("--x", action="append", default=[],
+                        help="valor de x a evaluar en todas las funciones (se puede repetir)")
+    parser.add_argument("-j", "--procesos", type=int, default=os.cpu_count() or 1,
+                        help="cantidad de procesos de trabajo (por defecto, uno por núcleo)")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="segundos máximos por fase de cada función")
+    parser.add_argument("--orden", choices=("entrada", "llegada"), default="entrada",
+                        help="escribir en el orden de entrada o a medida que terminan")
+    parser.add_argument("--pasos", action="store_true",
+                        help="incluir el paso a paso en la salida")
+    parser.add_argument("--cache", default=None,
+                        help="archivo SQLite de caché de resultados")
+    parser.add_argument("--perfil", default="",
+                        help="cprofile y/o tracemalloc, separados por coma (proceso principal)")
+    parser.add_argument("--traza", default=None,
+                        help="guardar una traza de fases en formato Chrome (JSON)")
+    parser.add_argument("--metricas", default=None,
+                        help="guardar los tiempos acumulados por fase (JSON)")
+    args = parser.parse_args(argv)
+
+    instrumentacion.activar_desde_entorno()
+    if args.perfil:
+        instrumentacion.iniciar_perfil(args.perfil.split(","), "perfil_lote")
+
+    archivo = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    try:
+        entradas = ((f, xs or list(args.x)) for f, xs in leer_entradas(archivo))
+        stats = procesar(entradas, max(1, args.procesos), args.timeout, args.orden,
+                         args.pasos, args.cache)
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
+
+    if args.traza:
+        registro.exportar_chrome(args.traza)
+    if args.metricas:
+        registro.exportar_json(args.metricas)
+    print(json.dumps(stats, ensure_ascii=False), file=sys.stderr)
+    return 0 if stats["fallidos"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
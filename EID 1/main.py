@@ -1,16 +1,27 @@
 import sys
-import tkinter as tk
-from analisis_funciones import AnalizadorFunciones
-from interfaz_usuario import AnalizadorFunciones
-from interfaz_usuario import MainWindow
-from PyQt6 import QtWidgets
+import time
+
+# el reloj de arranque empieza antes de cualquier import pesado
+_T0 = time.perf_counter()
+
+from PyQt6 import QtCore, QtWidgets
+
+import instrumentacion
+from instrumentacion import registro
+
 
 def main():
-    app = AnalizadorFunciones()
-    # Inicia el bucle de la aplicacion
-    app.mainloop()
-if __name__ == "__main__":
+    instrumentacion.activar_desde_entorno()
     app = QtWidgets.QApplication(sys.argv)
+    # SymPy y matplotlib no se importan aquí: la ventana los carga en segundo plano
+    from interfaz_usuario import MainWindow
     w = MainWindow()
     w.show()
-    sys.exit(app.exec())
+    registro.registrar("arranque.ventana", time.perf_counter() - _T0, _T0)
+    QtCore.QTimer.singleShot(0, lambda: registro.registrar(
+        "arranque.primera_pintura", time.perf_counter() - _T0, _T0))
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
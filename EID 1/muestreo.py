@@ -0,0 +1,601 @@
+import bisect
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import sympy as sp
+from sympy.printing.pycode import PythonCodePrinter
+
+# NumPy es opcional: si esta instalado se usa para evaluar lotes grandes,
+# si no, todo funciona con math puro. Se importa recién con el primer lote
+# grande (evaluar un punto o arrancar la interfaz no lo necesita).
+_np = None
+NumPyPrinter = None
+_numpy_cargado = False
+
+
+def _cargar_numpy() -> bool:
+    global _np, NumPyPrinter, _numpy_cargado
+    if not _numpy_cargado:
+        _numpy_cargado = True
+        try:
+            import numpy as _np
+            from sympy.printing.numpy import NumPyPrinter
+        except ImportError:  # pragma: no cover - depende del entorno
+            _np = None
+            NumPyPrinter = None
+    return _np is not None
+
+# A partir de este tamaño de lote conviene pasar por NumPy
+UMBRAL_NUMPY = 64
+
+# Errores que en math puro significan "no hay valor real en ese punto"
+_ERRORES_PUNTO = (ValueError, ZeroDivisionError, OverflowError, TypeError)
+
+
+def linspace(a: float, b: float, n: int):
+    if n < 2:
+        return [a]
+    step = (b - a) / (n - 1)
+    return [a + i * step for i in range(n)]
+
+
+def _generar_fuente(expr, x, printer) -> str:
+    """Genera el código fuente de una función de una variable para expr."""
+    cuerpo = printer.doprint(expr)
+    return f"def _f({x.name}):\n    return {cuerpo}\n"
+
+
+def _compilar_fuente(fuente: str, namespace: dict):
+    codigo = compile(fuente, "<muestreo>", "exec")
+    exec(codigo, namespace)
+    return namespace["_f"]
+
+
+class FuncionCompilada:
+    """
+    Kernel numérico de f(x): se genera y compila una sola vez a partir de la
+    expresión de SymPy y luego evalúa lotes de x sin pasar por subs/evalf.
+
+    Los puntos sin valor real (complejos, NaN, infinitos o |y| > y_clip)
+    se devuelven como None, igual que el muestreo punto a punto original.
+
+    `fuentes` trae el código ya generado ("escalar", "vectorial"; None si
+    el generador no pudo traducir la expresión) y `al_generar` se llama con
+    las fuentes cada vez que se genera una nueva: así CacheKernels las guarda.
+    """
+
+    def __init__(self, expr, x=None, fuentes=None, al_generar=None):
+        self.expr = expr
+        self.x = x if x is not None else sp.Symbol('x', real=True)
+        self.fuentes = dict(fuentes or {})
+        self._al_generar = al_generar
+        self._escalar = None
+        self._vectorial = None
+        self._vectorial_listo = False
+        self._usar_subs = False
+
+        try:
+            fuente = self._fuente("escalar",
+                                  lambda: PythonCodePrinter({'fully_qualified_modules': True}))
+            self._escalar = _compilar_fuente(fuente, {'math': math})
+        except Exception:
+            # expresión que el generador no sabe traducir: se evalúa con SymPy
+            self._usar_subs = True
+
+    def _fuente(self, tipo, printer):
+        if tipo not in self.fuentes:
+            try:
+                self.fuentes[tipo] = _generar_fuente(self.expr, self.x, printer())
+            except Exception:
+                self.fuentes[tipo] = None
+            if self._al_generar is not None:
+                self._al_generar(self.fuentes)
+        if self.fuentes[tipo] is None:
+            raise ValueError(f"sin código {tipo} para {self.expr}")
+        return self.fuentes[tipo]
+
+    def _compilar_vectorial(self):
+        """Kernel de NumPy, compilado la primera vez que llega un lote grande."""
+        self._vectorial_listo = True
+        if self._usar_subs or not _cargar_numpy():
+            return
+        try:
+            fuente = self._fuente("vectorial", NumPyPrinter)
+            self._vectorial = _compilar_fuente(fuente, {'numpy': _np})
+        except Exception:
+            self._vectorial = None
+
+    # ---------- Evaluación de un punto ----------
+    def _evaluar_subs(self, xv: float):
+        try:
+            yv = self.expr.subs(self.x, xv)
+            if yv.is_real is False:
+                return None
+            return float(yv)
+        except Exception:
+            return None
+
+    def __call__(self, xv: float):
+        """Evalúa un punto; devuelve float (posiblemente no finito) o None."""
+        if self._usar_subs:
+            return self._evaluar_subs(xv)
+        try:
+            y = self._escalar(xv)
+        except _ERRORES_PUNTO:
+            return None
+        if isinstance(y, complex):
+            return None
+        try:
+            return float(y)
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+    # ---------- Evaluación por lotes ----------
+    def _lote_numpy(self, xs, y_clip):
+        arr = _np.asarray(xs, dtype=float)
+        with _np.errstate(all='ignore'):
+            ys = self._vectorial(arr)
+        ys = _np.broadcast_to(_np.asarray(ys), arr.shape)
+        if _np.iscomplexobj(ys):
+            real = _np.abs(ys.imag) == 0
+            ys = _np.where(real, ys.real, _np.nan)
+        ys = ys.astype(float)
+        malos = ~_np.isfinite(ys)
+        if y_clip is not None:
+            with _np.errstate(invalid='ignore'):
+                malos |= _np.abs(ys) > y_clip
+        salida = ys.tolist()
+        for i in _np.flatnonzero(malos).tolist():
+            salida[i] = None
+        return salida
+
+    def evaluar_lote(self, xs, y_clip=None):
+        """
+        Evalúa f en todos los xs de una vez. Devuelve una lista con un float
+        por punto o None donde no hay valor graficable.
+        """
+        if len(xs) >= UMBRAL_NUMPY and not self._vectorial_listo:
+            self._compilar_vectorial()
+        if self._vectorial is not None and len(xs) >= UMBRAL_NUMPY:
+            try:
+                return self._lote_numpy(xs, y_clip)
+            except Exception:
+                # p. ej. funciones que NumPy no vectoriza: seguimos en math puro
+                self._vectorial = None
+
+        salida = []
+        append = salida.append
+        evaluar = self.__call__
+        isfinite = math.isfinite
+        for xv in xs:
+            y = evaluar(xv)
+            if y is None or not isfinite(y) or (y_clip is not None and abs(y) > y_clip):
+                append(None)
+            else:
+                append(y)
+        return salida
+
+
+def compilar(expr, x=None) -> FuncionCompilada:
+    return FuncionCompilada(expr, x)
+
+
+# ---------- Caché de kernels ----------
+# Se sube si cambia la forma del código generado
+VERSION_KERNELS = 1
+
+
+class CacheKernels:
+    """
+    Kernels compilados por expresión, para no volver a generar el código.
+
+    Generar el código con los printers de SymPy es lo caro (de 5 a 20 ms
+    en expresiones medianas); compilarlo es casi gratis. En memoria se
+    guardan los FuncionCompilada ya listos (LRU) y, si se indica `carpeta`,
+    el código generado en un JSON por expresión que otras sesiones y
+    procesos cargan sin pasar por los printers. La clave incluye la versión
+    de SymPy porque de ella depende el código que se genera.
+    """
+
+    def __init__(self, max_entradas: int = 128, carpeta=None, max_archivos: int = 2000):
+        self.max_entradas = max_entradas
+        self.max_archivos = max_archivos
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._escrituras = 0
+        self.hits = 0
+        self.hits_disco = 0
+        self.misses = 0
+        self.evictions = 0
+        self.carpeta = None
+        if carpeta:
+            try:
+                os.makedirs(carpeta, exist_ok=True)
+                self.carpeta = carpeta
+            except OSError:
+                # sin disco disponible seguimos solo en memoria
+                pass
+
+    def clave(self, canon: str) -> str:
+        texto = f"v{VERSION_KERNELS}|{sp.__version__}|{canon}"
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.carpeta, clave + ".json")
+
+    def _leer(self, clave: str):
+        try:
+            with open(self._ruta(clave), encoding="utf-8") as f:
+                fuentes = json.load(f)
+            # se toca el archivo: la purga borra los menos usados
+            os.utime(self._ruta(clave))
+        except (OSError, ValueError):
+            return None
+        return fuentes if isinstance(fuentes, dict) else None
+
+    def _escribir(self, clave: str, fuentes: dict):
+        if self.carpeta is None:
+            return
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            # escritura atómica: otro proceso nunca ve un archivo a medias
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(fuentes, f)
+            os.replace(temporal, ruta)
+        except (OSError, TypeError, ValueError):
+            return
+        self._escrituras += 1
+        if self._escrituras % 50 == 0:
+            self._purgar_disco()
+
+    def _purgar_disco(self):
+        try:
+            archivos = [e for e in os.scandir(self.carpeta) if e.name.endswith(".json")]
+            if len(archivos) <= self.max_archivos:
+                return
+            archivos.sort(key=lambda e: e.stat().st_mtime)
+            for e in archivos[:len(archivos) - self.max_archivos]:
+                os.remove(e.path)
+        except OSError:
+            pass
+
+    def compilar(self, expr, x=None, canon=None) -> FuncionCompilada:
+        """
+        Kernel de expr. `canon` es su forma canónica (srepr) si ya se tiene
+        a mano: expresiones iguales comparten kernel.
+        """
+        clave = self.clave(canon if canon is not None else sp.srepr(expr))
+        with self._lock:
+            kernel = self._memoria.get(clave)
+            if kernel is not None:
+                self._memoria.move_to_end(clave)
+                self.hits += 1
+                return kernel
+            fuentes = self._leer(clave) if self.carpeta is not None else None
+            if fuentes is not None:
+                self.hits += 1
+                self.hits_disco += 1
+            else:
+                self.misses += 1
+
+        kernel = FuncionCompilada(expr, x, fuentes,
+                                  al_generar=lambda f: self._escribir(clave, f))
+        with self._lock:
+            self._memoria[clave] = kernel
+            while len(self._memoria) > self.max_entradas:
+                self._memoria.popitem(last=False)
+                self.evictions += 1
+        return kernel
+
+    def limpiar(self):
+        with self._lock:
+            self._memoria.clear()
+            if self.carpeta is not None:
+                for e in os.scandir(self.carpeta):
+                    if e.name.endswith(".json"):
+                        os.remove(e.path)
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "hits_disco": self.hits_disco,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entradas_memoria": len(self._memoria),
+            "tasa_aciertos": self.hits / total if total else 0.0,
+        }
+
+
+def muestrear(expr, x_min: float, x_max: float, n: int, y_clip=None):
+    """Atajo: compila expr y devuelve (xs, ys) sobre una malla uniforme."""
+    kernel = expr if isinstance(expr, FuncionCompilada) else compilar(expr)
+    xs = linspace(x_min, x_max, n)
+    return xs, kernel.evaluar_lote(xs, y_clip=y_clip)
+
+
+# ---------- Muestreo adaptativo ----------
+Muestreo = namedtuple("Muestreo", "xs ys cortes evaluaciones")
+
+
+def _puntos_alrededor(c: float, ancho: float):
+    # puntos densos alrededor de c para dibujar cerca de asintotas/fronteras
+    salida = [c]
+    for k in (1e-2, 1e-3, 1e-4, 1e-6):
+        eps = k * ancho
+        salida.extend((c - eps, c + eps))
+    return salida
+
+
+def _refinar(ya, ym, yb, tol):
+    """Decide si hay que seguir partiendo cada mitad de [a, b]."""
+    if ya is None and yb is None:
+        # isla de valores dentro de un hueco
+        return ym is not None, ym is not None
+    if ya is None or yb is None:
+        # borde de dominio o de recorte: se sigue solo la mitad que lo contiene
+        return (ya is None) != (ym is None), (ym is None) != (yb is None)
+    if ym is None:
+        return True, True
+    if abs(ym - (ya + yb) / 2) > tol:
+        return True, True
+    return False, False
+
+
+def muestrear_adaptativo(f, x_min: float, x_max: float, criticos=(), n_inicial: int = 401,
+                         max_nivel: int = 12, tolerancia: float = 1e-3, y_clip=None,
+                         max_puntos: int = 20000) -> Muestreo:
+    """
+    Muestrea f en [x_min, x_max] partiendo a la mitad solo donde la curva
+    se aleja de la recta entre dos puntos vecinos (más de `tolerancia`
+    veces el alto de la curva), donde aparece o desaparece el valor (bordes
+    del dominio, recorte y_clip) y alrededor de los puntos `criticos`.
+
+    Los saltos que no se achican al partir el intervalo (asíntotas, floor,
+    Piecewise discontinuas) se marcan con un None entre los dos puntos, y
+    sus abscisas se devuelven en `cortes`.
+    """
+    kernel = f if isinstance(f, FuncionCompilada) else compilar(f)
+    ancho = x_max - x_min
+    xs = linspace(x_min, x_max, n_inicial)
+    for c in criticos:
+        if x_min <= c <= x_max:
+            xs.extend(p for p in _puntos_alrededor(c, ancho) if x_min <= p <= x_max)
+    xs = sorted(set(xs))
+    ys = kernel.evaluar_lote(xs, y_clip=y_clip)
+    evaluaciones = len(xs)
+
+    finitos = [y for y in ys if y is not None]
+    escala = (max(finitos) - min(finitos)) if len(finitos) > 1 else 0.0
+    escala = escala or 1.0
+    tol = tolerancia * escala
+
+    # intervalos activos iniciales: cambios None/valor y curvatura alta
+    activos = [(ys[i] is None) != (ys[i + 1] is None) for i in range(len(xs) - 1)]
+    for i in range(1, len(xs) - 1):
+        y0, y1, y2 = ys[i - 1], ys[i], ys[i + 1]
+        if y0 is not None and y1 is not None and y2 is not None \
+                and abs(y1 - (y0 + y2) / 2) > tol:
+            activos[i - 1] = activos[i] = True
+    # salto |Δy| del intervalo padre, para distinguir saltos de pendientes
+    previos = [None] * len(activos)
+
+    for _ in range(max_nivel):
+        idx = [i for i, a in enumerate(activos) if a]
+        if not idx or len(xs) + len(idx) > max_puntos:
+            break
+        medios = [(xs[i] + xs[i + 1]) / 2 for i in idx]
+        ym_lote = kernel.evaluar_lote(medios, y_clip=y_clip)
+        evaluaciones += len(medios)
+
+        nx, ny, na, npv = [], [], [], []
+        k = 0
+        for i in range(len(xs) - 1):
+            nx.append(xs[i]); ny.append(ys[i])
+            if not activos[i]:
+                na.append(False); npv.append(None)
+                continue
+            ya, ym, yb = ys[i], ym_lote[k], ys[i + 1]
+            nx.append(medios[k]); ny.append(ym)
+            na.extend(_refinar(ya, ym, yb, tol))
+            previo = abs(yb - ya) if ya is not None and yb is not None else None
+            npv.extend((previo, previo))
+            k += 1
+        nx.append(xs[-1]); ny.append(ys[-1])
+        xs, ys, activos, previos = nx, ny, na, npv
+
+    # saltos que no se achicaron al partir: se corta la curva para no
+    # unirlos con una recta vertical
+    salida_xs, salida_ys, cortes = [], [], []
+    for i in range(len(xs) - 1):
+        salida_xs.append(xs[i]); salida_ys.append(ys[i])
+        ya, yb = ys[i], ys[i + 1]
+        if activos[i] and ya is not None and yb is not None and previos[i] is not None \
+                and abs(yb - ya) > max(5 * tol, 0.9 * previos[i]):
+            xm = (xs[i] + xs[i + 1]) / 2
+            salida_xs.append(xm); salida_ys.append(None)
+            cortes.append(xm)
+    if xs:
+        salida_xs.append(xs[-1]); salida_ys.append(ys[-1])
+
+    return Muestreo(salida_xs, salida_ys, cortes, evaluaciones)
+
+
+# ---------- Varias curvas ----------
+def unir_muestreos(kernels, muestreos, y_clip=None):
+    """
+    Malla común para comparar curvas: la unión de las abscisas de sus
+    muestreos adaptativos, así cada una aporta su refinamiento cerca de
+    sus puntos críticos y saltos. Cada kernel se evalúa en toda la malla
+    (de una vez, por lotes) y sus propios cortes siguen siendo None.
+    Devuelve (xs, [ys de cada curva]).
+    """
+    xs = sorted(set().union(*(m.xs for m in muestreos)))
+    indice = None
+    ys_curvas = []
+    for kernel, m in zip(kernels, muestreos):
+        ys = kernel.evaluar_lote(xs, y_clip=y_clip)
+        if m.cortes:
+            if indice is None:
+                indice = {x: i for i, x in enumerate(xs)}
+            for c in m.cortes:
+                if c in indice:
+                    ys[indice[c]] = None
+        ys_curvas.append(ys)
+    return xs, ys_curvas
+
+
+# ---------- Muestreo por bloques (exportación) ----------
+def bloques_uniformes(kernel, x_min: float, x_max: float, n: int, criticos=(),
+                      y_clip=None, bloque: int = 65536):
+    """
+    Genera (xs, ys) de a `bloque` puntos de una malla uniforme de n puntos,
+    sin armar nunca la malla entera. En cada punto de `criticos` (los que
+    el dominio excluye) se intercala un corte (y = None), salvo que caiga
+    justo sobre la malla: ahí ya está su valor (o su None).
+    """
+    if n < 2:
+        yield [x_min], kernel.evaluar_lote([x_min], y_clip=y_clip)
+        return
+    paso = (x_max - x_min) / (n - 1)
+    pendientes = sorted(c for c in criticos if x_min < c < x_max)
+    k = 0
+    for inicio in range(0, n, bloque):
+        fin = min(n, inicio + bloque)
+        xs = [x_min + i * paso for i in range(inicio, fin)]
+        if fin == n:
+            xs[-1] = x_max
+        ys = kernel.evaluar_lote(xs, y_clip=y_clip)
+        # cortes que caen hasta el último punto del bloque (inclusive: uno
+        # justo en el borde ya está en la malla y no se repite en el siguiente)
+        while k < len(pendientes) and pendientes[k] <= xs[-1]:
+            j = bisect.bisect_left(xs, pendientes[k])
+            if xs[j] != pendientes[k]:
+                xs.insert(j, pendientes[k])
+                ys.insert(j, None)
+            k += 1
+        yield xs, ys
+
+
+def bloques_adaptativos(kernel, x_min: float, x_max: float, tramos: int, criticos=(),
+                        y_clip=None, n_inicial: int = 401):
+    """Muestreo adaptativo de [x_min, x_max] en `tramos` partes, generando (xs, ys) por tramo."""
+    ancho = (x_max - x_min) / tramos
+    for i in range(tramos):
+        a = x_min + i * ancho
+        b = x_max if i == tramos - 1 else x_min + (i + 1) * ancho
+        m = muestrear_adaptativo(kernel, a, b, [c for c in criticos if a <= c <= b],
+                                 n_inicial=n_inicial, y_clip=y_clip)
+        # tramos vecinos comparten el extremo
+        inicio = 1 if i > 0 else 0
+        yield m.xs[inicio:], m.ys[inicio:]
+
+
+# ---------- Diezmado para dibujar ----------
+def _agregar_extremos(sx, sy, xs, ys, i_min, i_max):
+    if i_min == i_max:
+        sx.append(xs[i_min]); sy.append(ys[i_min])
+    else:
+        for i in sorted((i_min, i_max)):
+            sx.append(xs[i]); sy.append(ys[i])
+
+
+def diezmar(xs, ys, x_min: float, x_max: float, columnas: int):
+    """
+    Reduce la curva a lo sumo a un mínimo y un máximo por columna de píxel
+    (en el orden de x), que es todo lo que se llega a ver: la envolvente,
+    los extremos y los cortes (y None) se conservan y el dibujo queda con
+    unos 2·columnas vértices sin importar cuántas muestras haya.
+    """
+    if columnas <= 0 or len(xs) <= 2 * columnas or not x_max > x_min:
+        return xs, ys
+    escala = columnas / (x_max - x_min)
+    floor = math.floor
+    sx, sy = [], []
+    col = None
+    i_min = i_max = 0
+    for i, y in enumerate(ys):
+        if y is None:
+            if col is not None:
+                _agregar_extremos(sx, sy, xs, ys, i_min, i_max)
+                col = None
+            # un solo corte por tramo sin valores
+            if not sy or sy[-1] is not None:
+                sx.append(xs[i]); sy.append(None)
+            continue
+        c = floor((xs[i] - x_min) * escala)
+        if c != col:
+            if col is not None:
+                _agregar_extremos(sx, sy, xs, ys, i_min, i_max)
+            col, i_min, i_max = c, i, i
+        elif y < ys[i_min]:
+            i_min = i
+        elif y > ys[i_max]:
+            i_max = i
+    if col is not None:
+        _agregar_extremos(sx, sy, xs, ys, i_min, i_max)
+    return sx, sy
+
+
+# ---------- Teselas para pan/zoom ----------
+class CacheTeselas:
+    """
+    Guarda el muestreo en teselas de x para reutilizarlo al navegar.
+
+    El ancho de tesela es una potencia de 2 elegida según el ancho de la
+    vista (entre 8 y 16 teselas por vista), así que al desplazar solo se
+    muestrean las teselas nuevas y al hacer un zoom leve se reutilizan
+    todas. La clave es (expresión, nivel, índice de tesela, y_clip y los
+    puntos críticos que caen en la tesela).
+    """
+
+    def __init__(self, max_teselas: int = 512, puntos_por_tesela: int = 65):
+        self.max_teselas = max_teselas
+        self.puntos_por_tesela = puntos_por_tesela
+        self._teselas = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _tesela(self, kernel, clave, nivel, i, ancho, criticos, y_clip):
+        a, b = i * ancho, (i + 1) * ancho
+        # los críticos de la tesela van en la clave: si llegan después del
+        # primer dibujo (análisis en segundo plano) la tesela se vuelve a muestrear
+        propios = tuple(sorted(c for c in criticos if a <= c <= b))
+        k = (clave, nivel, i, y_clip, propios)
+        m = self._teselas.get(k)
+        if m is not None:
+            self._teselas.move_to_end(k)
+            self.hits += 1
+            return m
+        self.misses += 1
+        m = muestrear_adaptativo(kernel, a, b, list(propios),
+                                 n_inicial=self.puntos_por_tesela, y_clip=y_clip)
+        self._teselas[k] = m
+        while len(self._teselas) > self.max_teselas:
+            self._teselas.popitem(last=False)
+        return m
+
+    def muestrear(self, kernel, clave, x_min: float, x_max: float, criticos=(),
+                  y_clip=None) -> Muestreo:
+        nivel = math.floor(math.log2((x_max - x_min) / 8))
+        ancho = 2.0 ** nivel
+        xs, ys, cortes, evaluaciones = [], [], [], 0
+        for i in range(math.floor(x_min / ancho), math.ceil(x_max / ancho)):
+            antes = self.misses
+            m = self._tesela(kernel, clave, nivel, i, ancho, criticos, y_clip)
+            if self.misses != antes:
+                evaluaciones += m.evaluaciones
+            # teselas vecinas comparten el extremo
+            inicio = 1 if xs and m.xs and xs[-1] == m.xs[0] else 0
+            xs.extend(m.xs[inicio:])
+            ys.extend(m.ys[inicio:])
+            cortes.extend(m.cortes)
+        return Muestreo(xs, ys, cortes, evaluaciones)
+
+    def limpiar(self):
+        self._teselas.clear()
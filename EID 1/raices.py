@@ -0,0 +1,221 @@
+"""
+Búsqueda numérica de raíces reales de f(x) = 0.
+
+Es el respaldo de solveset cuando este se demora demasiado o devuelve algo
+que no es una lista finita de soluciones (ConditionSet, familias
+periódicas): se muestrea f con el kernel compilado en una grilla, se
+encierran las raíces por cambio de signo y se refinan con Brent. Los
+mínimos de |f| que tocan el cero sin cambiar de signo (raíces dobles) se
+refinan por sección áurea. Todo tiene una cantidad acotada de
+evaluaciones, así que el tiempo está acotado.
+"""
+import math
+import signal
+import threading
+from contextlib import contextmanager
+
+import muestreo
+
+# Ventana donde se buscan raíces numéricas y resolución de la grilla
+VENTANA = (-10.0, 10.0)
+N_GRILLA = 2001
+
+
+class TiempoAgotado(Exception):
+    pass
+
+
+@contextmanager
+def limite_tiempo(segundos):
+    """
+    Interrumpe el bloque con TiempoAgotado si dura más de `segundos`.
+    Usa SIGALRM, así que solo limita en el hilo principal de sistemas que lo
+    tengan (el proceso de análisis); en otro caso el bloque corre sin límite.
+    """
+    if (segundos is None or not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def _alarma(signum, frame):
+        raise TiempoAgotado()
+
+    anterior = signal.signal(signal.SIGALRM, _alarma)
+    signal.setitimer(signal.ITIMER_REAL, segundos)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+def brent(f, a, b, fa, fb, xtol=1e-12, rtol=4 * 2.2e-16, max_iter=100):
+    """
+    Raíz de f en [a, b] con fa y fb de signos opuestos (método de Brent:
+    interpolación inversa con bisección de respaldo). Devuelve None si f
+    deja de tener valor dentro del intervalo.
+    """
+    xpre, xcur, fpre, fcur = a, b, fa, fb
+    xblk = fblk = spre = scur = 0.0
+    if fpre == 0:
+        return xpre
+    if fcur == 0:
+        return xcur
+    for _ in range(max_iter):
+        if fpre * fcur < 0:
+            xblk, fblk = xpre, fpre
+            spre = scur = xcur - xpre
+        if abs(fblk) < abs(fcur):
+            xpre, xcur, xblk = xcur, xblk, xcur
+            fpre, fcur, fblk = fcur, fblk, fcur
+
+        delta = (xtol + rtol * abs(xcur)) / 2
+        sbis = (xblk - xcur) / 2
+        if fcur == 0 or abs(sbis) < delta:
+            return xcur
+
+        if abs(spre) > delta and abs(fcur) < abs(fpre):
+            if xpre == xblk:
+                # interpolación lineal
+                stry = -fcur * (xcur - xpre) / (fcur - fpre)
+            else:
+                # interpolación cuadrática inversa
+                dpre = (fpre - fcur) / (xpre - xcur)
+                dblk = (fblk - fcur) / (xblk - xcur)
+                stry = -fcur * (fblk * dblk - fpre * dpre) / (dblk * dpre * (fblk - fpre))
+            if 2 * abs(stry) < min(abs(spre), 3 * abs(sbis) - delta):
+                spre, scur = scur, stry
+            else:
+                spre = scur = sbis
+        else:
+            spre = scur = sbis
+
+        xpre, fpre = xcur, fcur
+        xcur += scur if abs(scur) > delta else (delta if sbis > 0 else -delta)
+        fcur = f(xcur)
+        if fcur is None or not math.isfinite(fcur):
+            return None
+    return xcur
+
+
+def _minimo_abs(f, a, b, iteraciones=60):
+    """Mínimo de |f| en [a, b] por sección áurea; devuelve (x, |f(x)|)."""
+    r = (math.sqrt(5) - 1) / 2
+
+    def g(t):
+        y = f(t)
+        return math.inf if y is None or not math.isfinite(y) else abs(y)
+
+    c, d = b - r * (b - a), a + r * (b - a)
+    gc, gd = g(c), g(d)
+    for _ in range(iteraciones):
+        if gc < gd:
+            b, d, gd = d, c, gc
+            c = b - r * (b - a)
+            gc = g(c)
+        else:
+            a, c, gc = c, d, gd
+            d = a + r * (b - a)
+            gd = g(d)
+    return (c, gc) if gc < gd else (d, gd)
+
+
+def buscar_raices(f, x_min=VENTANA[0], x_max=VENTANA[1], n=N_GRILLA):
+    """
+    Raíces reales de f en [x_min, x_max]. `f` es un muestreo.FuncionCompilada
+    (o cualquier función float -> float/None). Devuelve una lista ordenada
+    de floats.
+    """
+    return buscar_ceros(f, x_min, x_max, n)[0]
+
+
+def buscar_ceros(f, x_min=VENTANA[0], x_max=VENTANA[1], n=N_GRILLA):
+    """
+    (raíces, tramos) de f en [x_min, x_max]: las raíces aisladas como en
+    buscar_raices y los tramos (a, b) de la grilla donde f se anula en
+    puntos seguidos (p. ej. floor(x) en [0, 1)), con a y b aproximados al
+    paso de la grilla.
+    """
+    xs = muestreo.linspace(x_min, x_max, n)
+    if hasattr(f, "evaluar_lote"):
+        ys = f.evaluar_lote(xs)
+    else:
+        ys = [f(x) for x in xs]
+        ys = [y if y is not None and math.isfinite(y) else None for y in ys]
+
+    finitos = [abs(y) for y in ys if y is not None]
+    if not finitos:
+        return [], []
+    escala = max(1.0, sorted(finitos)[len(finitos) // 2])
+    tol_y = 1e-9 * escala
+
+    raices, tramos, inicio = [], [], None
+    for i in range(n - 1):
+        ya, yb = ys[i], ys[i + 1]
+        if ya is None or yb is None:
+            continue
+        if ya == 0:
+            # ceros seguidos en la grilla: f se anula en todo un tramo, que
+            # va aparte (sus puntos no son raíces aisladas que listar)
+            seguido = i > 0 and ys[i - 1] == 0
+            if yb == 0:
+                if not seguido:
+                    inicio = xs[i]
+            elif seguido:
+                tramos.append((inicio, xs[i]))
+            else:
+                raices.append(xs[i])
+        elif ya * yb < 0:
+            r = brent(f, xs[i], xs[i + 1], ya, yb)
+            if r is None:
+                continue
+            fr = f(r)
+            # un cambio de signo a través de un polo o un salto no es raíz
+            if fr is not None and abs(fr) <= 1e-6 * max(abs(ya), abs(yb)):
+                raices.append(r)
+        elif 0 < i and ys[i - 1] is not None:
+            # mínimo local de |f| sin cambio de signo: posible raíz doble
+            y0 = ys[i - 1]
+            if abs(ya) < abs(y0) and abs(ya) <= abs(yb) and y0 * ya > 0 and ya * yb > 0:
+                r, fr = _minimo_abs(f, xs[i - 1], xs[i + 1])
+                if fr <= tol_y:
+                    raices.append(r)
+    if ys[-1] == 0:
+        if ys[-2] == 0:
+            tramos.append((inicio, xs[-1]))
+        else:
+            raices.append(xs[-1])
+
+    # las que cayeron dos veces (en la grilla y al refinar) se juntan
+    unicas = []
+    for r in sorted(raices):
+        if not unicas or abs(r - unicas[-1]) > 1e-9 * (1 + abs(r)):
+            unicas.append(r)
+    return unicas, tramos
+
+
+class _Diferencia:
+    """f - g a partir de dos kernels (None donde alguna no tiene valor)."""
+
+    def __init__(self, f, g):
+        self.f, self.g = f, g
+
+    def __call__(self, xv):
+        a, b = self.f(xv), self.g(xv)
+        if a is None or b is None:
+            return None
+        return a - b
+
+    def evaluar_lote(self, xs):
+        return [None if a is None or b is None else a - b
+                for a, b in zip(self.f.evaluar_lote(xs), self.g.evaluar_lote(xs))]
+
+
+def intersecciones_curvas(f, g, x_min=VENTANA[0], x_max=VENTANA[1], n=N_GRILLA):
+    """Puntos (x, y) donde se cortan las curvas de los kernels f y g."""
+    puntos = []
+    for r in buscar_raices(_Diferencia(f, g), x_min, x_max, n):
+        y = f(r)
+        if y is not None and math.isfinite(y):
+            puntos.append((r, y))
+    return puntos
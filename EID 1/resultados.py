@@ -0,0 +1,137 @@
+"""
+Resultados del analizador como objetos compactos.
+
+Son namedtuples (inmutables, livianos, se pasan por pickle entre procesos
+y a la caché en disco) que guardan los valores exactos de SymPy junto con
+su aproximación en float, así quien los usa (interfaz, lotes, servicio)
+no tiene que volver a parsear texto. `texto` da la forma legible de
+siempre y `a_json()` los pasa a tipos básicos.
+"""
+import math
+from collections import namedtuple
+
+
+def _a_float(exacto):
+    try:
+        numero = float(exacto)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return numero if math.isfinite(numero) else None
+
+
+class Valor(namedtuple("Valor", "exacto numero")):
+    """Un número exacto de SymPy (o None) y su valor en float (o None)."""
+    __slots__ = ()
+
+    @classmethod
+    def desde(cls, exacto):
+        return cls(exacto, _a_float(exacto))
+
+    def __str__(self):
+        if self.exacto is not None:
+            return str(self.exacto)
+        return "?" if self.numero is None else f"{self.numero:.10g}"
+
+    def a_json(self) -> dict:
+        return {"exacto": None if self.exacto is None else str(self.exacto),
+                "numero": self.numero}
+
+
+class Dominio(namedtuple("Dominio", "conjunto excluidos pasos error",
+                         defaults=((), None, None))):
+    """conjunto: Set de SymPy; excluidos: ceros del denominador (Valor)."""
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def texto(self) -> str:
+        return self.error if self.error else str(self.conjunto)
+
+    def a_json(self) -> dict:
+        return {"dominio": self.texto, "excluidos": [v.a_json() for v in self.excluidos]}
+
+
+class Recorrido(namedtuple("Recorrido", "conjunto pasos error", defaults=(None, None))):
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def texto(self) -> str:
+        return self.error if self.error else str(self.conjunto)
+
+    def a_json(self) -> dict:
+        return {"recorrido": self.texto}
+
+
+def _texto_tramo(tramo) -> str:
+    """Interval de SymPy como [a, b) (los extremos en float, con 10 cifras)."""
+    a, b = (f"{float(e):.10g}" if e.is_Float else str(e) for e in (tramo.start, tramo.end))
+    return f"{'(' if tramo.left_open else '['}{a}, {b}{')' if tramo.right_open else ']'}"
+
+
+class Intersecciones(namedtuple("Intersecciones", "y x pasos_y pasos_x error metodo_x tramos_x",
+                                defaults=(None, None, None, "exacto", ()))):
+    """
+    y: f(0) como Valor (None si 0 no está en el dominio); x: raíces (Valor).
+    metodo_x: "exacto" (solveset) o "numerico" (aproximadas, sin exacto).
+    tramos_x: intervalos (Interval) donde f vale 0 en todo punto.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def texto_y(self) -> str:
+        if self.error:
+            return self.error
+        return f"(0, {self.y})" if self.y is not None else "no existe"
+
+    @property
+    def texto_x(self) -> str:
+        if self.error:
+            return self.error
+        if not self.x and not self.tramos_x:
+            return "no existen intersecciones reales"
+        aprox = " (aprox.)" if self.metodo_x == "numerico" else ""
+        partes = []
+        if self.x:
+            partes.append(f"Puntos{aprox}: " + ", ".join(f"({r}, 0)" for r in self.x))
+        if self.tramos_x:
+            partes.append(f"f(x) = 0 en todo el intervalo{aprox}: "
+                          + ", ".join(_texto_tramo(t) for t in self.tramos_x))
+        return "; ".join(partes)
+
+    def a_json(self) -> dict:
+        return {
+            "interseccion_y": None if self.y is None else self.y.a_json(),
+            "intersecciones_x": [r.a_json() for r in self.x],
+            "tramos_x": [_texto_tramo(t) for t in self.tramos_x],
+            "metodo_x": self.metodo_x,
+        }
+
+
+class Evaluacion(namedtuple("Evaluacion", "entrada x y pasos error",
+                            defaults=(None, None, None, None))):
+    """Evaluación de f en un punto: x e y como Valor; y es None si falló."""
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.y is not None
+
+    def a_json(self) -> dict:
+        item = {"x": self.entrada, "ok": self.ok}
+        if self.ok:
+            item["valor"] = self.y.numero
+            item["exacto"] = None if self.y.exacto is None else str(self.y.exacto)
+        else:
+            item["error"] = self.error
+        return item
@@ -0,0 +1,425 @@
+"""
+Servicio local del analizador (JSON-RPC 2.0 sobre HTTP, solo biblioteca estándar).
+
+Otras herramientas llaman al analizador sin lanzar Python ni importar
+SymPy en cada pedido: los procesos de análisis quedan calientes en un pool
+(los mismos EjecutorAnalisis de la interfaz y del modo por lotes).
+
+    python servicio.py --puerto 8765 -j 4
+    python servicio.py --llamar dominio --funcion "1/(x-2)"
+
+Métodos: dominio, recorrido, intersecciones, evaluar (params "x"),
+muestrear (params x_min, x_max, n, y_clip) y analizar (todas las fases).
+Todos reciben "funcion" y opcionalmente "timeout" en segundos.
+
+    POST /rpc      {"jsonrpc": "2.0", "id": 1, "method": "dominio",
+                    "params": {"funcion": "1/(x-2)"}}
+    GET  /metricas tiempos por método y por fase, contadores y estado del pool
+    GET  /salud    {"ok": true}
+
+Pedidos idénticos (la misma expresión una vez parseada, como en la caché
+de resultados) que llegan mientras otro igual está en curso esperan el
+mismo resultado (no se calcula dos veces). Si la cola de espera está llena
+se responde enseguida con el error -32000 (HTTP 503) en lugar de acumular.
+Cuando se les acaba el tiempo a todos los que esperan un trabajo, el
+trabajo se cancela y el proceso queda libre para el siguiente pedido.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, TimeoutError as FuturoAgotado
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import instrumentacion
+from instrumentacion import registro
+from lote import armar_resultado
+from trabajador import EjecutorAnalisis, FASES, contexto_procesos
+
+# método -> fases que ejecuta
+METODOS = {
+    "dominio": ("dominio",),
+    "recorrido": ("recorrido",),
+    "intersecciones": ("intersecciones",),
+    "evaluar": ("evaluacion",),
+    "muestrear": ("muestreo",),
+    "analizar": tuple(f for f in FASES if f != "criticos"),
+}
+
+# Códigos de error JSON-RPC
+ERROR_PARSEO = -32700
+PEDIDO_INVALIDO = -32600
+METODO_INEXISTENTE = -32601
+PARAMETROS_INVALIDOS = -32602
+ERROR_INTERNO = -32603
+OCUPADO = -32000
+TIEMPO_AGOTADO = -32001
+
+MAX_CUERPO = 1 << 20
+
+
+class ErrorRPC(Exception):
+    def __init__(self, codigo: int, mensaje: str):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+class PoolAnalisis:
+    """
+    Reparte pedidos entre `procesos` ejecutores precalentados. Un hilo
+    despachador es el único que toca los ejecutores (no son thread-safe);
+    los hilos del servidor solo encolan y esperan un Future.
+    """
+
+    def __init__(self, procesos: int = 2, timeout: float = 10.0, max_cola: int = 64,
+                 ruta_cache=None):
+        self.timeout = timeout
+        self._cola = queue.Queue(maxsize=max_cola)
+        self._lock = threading.Lock()
+        self._en_vuelo = {}       # clave -> Future (para juntar pedidos idénticos)
+        self._esperando = {}      # Future -> pedidos que todavía lo esperan
+        self._abandonados = set() # Futures sin nadie esperando: se cancelan
+        self._en_curso = 0
+        self._cerrado = threading.Event()
+        ctx = contexto_procesos()
+        presupuestos = {f: timeout for f in list(FASES) + ["muestreo"]}
+        self._ejecutores = [EjecutorAnalisis(presupuestos=presupuestos, ruta_cache=ruta_cache,
+                                             ctx=ctx, con_pasos=False)
+                            for _ in range(max(1, procesos))]
+        for ej in self._ejecutores:
+            ej.precalentar()
+        # solo para la clave de los pedidos: el análisis va en los procesos
+        from analisis_funciones import AnalizadorFunciones
+        self._analizador = AnalizadorFunciones(con_pasos=False)
+        self._hilo = threading.Thread(target=self._despachar, name="despachador", daemon=True)
+        self._hilo.start()
+
+    def _canonica(self, funcion: str) -> str:
+        """srepr de la función (la clave de la caché de resultados); el texto si no parsea."""
+        sesion = self._analizador.sesion(funcion)
+        return sesion.clave if sesion.valida else funcion
+
+    def enviar(self, funcion: str, fases, datos=None) -> Future:
+        """Encola un pedido; si ya hay uno idéntico en curso devuelve su Future."""
+        clave = (self._canonica(funcion), tuple(fases), json.dumps(datos, sort_keys=True))
+        with self._lock:
+            futuro = self._en_vuelo.get(clave)
+            if futuro is not None:
+                registro.contar("rpc_coalescidos")
+                self._esperando[futuro] += 1
+                return futuro
+            futuro = Future()
+            try:
+                self._cola.put_nowait((clave, funcion, tuple(fases), datos, futuro))
+            except queue.Full:
+                registro.contar("rpc_rechazados")
+                raise ErrorRPC(OCUPADO, "Servicio ocupado: reintentar más tarde.") from None
+            self._en_vuelo[clave] = futuro
+            self._esperando[futuro] = 1
+        return futuro
+
+    def abandonar(self, futuro: Future):
+        """
+        Un pedido dejó de esperar `futuro` (se le acabó el tiempo). Si era el
+        último, el despachador cancela el trabajo en lugar de dejarlo ocupando
+        un proceso hasta agotar los presupuestos de cada fase.
+        """
+        with self._lock:
+            if futuro not in self._esperando:
+                return
+            self._esperando[futuro] -= 1
+            if self._esperando[futuro] > 0 or futuro.done():
+                return
+            del self._esperando[futuro]
+            self._abandonados.add(futuro)
+            # un pedido idéntico que llegue ahora empieza de cero
+            for clave, f in list(self._en_vuelo.items()):
+                if f is futuro:
+                    del self._en_vuelo[clave]
+
+    def _tomar_abandonado(self, futuro: Future) -> bool:
+        with self._lock:
+            if futuro in self._abandonados:
+                self._abandonados.discard(futuro)
+                return True
+            return False
+
+    def _despachar(self):
+        libres = list(self._ejecutores)
+        en_curso = {}             # ejecutor -> (clave, datos, futuro, eventos)
+        while not self._cerrado.is_set():
+            while libres:
+                try:
+                    # sin nada en curso se espera en la cola en vez de girar
+                    tarea = self._cola.get(timeout=0.05) if not en_curso else self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                clave, funcion, fases, datos, futuro = tarea
+                if self._tomar_abandonado(futuro):
+                    futuro.cancel()
+                    continue
+                ej = libres.pop()
+                ej.iniciar(funcion, datos, fases=fases)
+                en_curso[ej] = (clave, funcion, datos, futuro, {})
+
+            for ej in list(en_curso):
+                clave, funcion, datos, futuro, eventos = en_curso[ej]
+                if self._tomar_abandonado(futuro):
+                    registro.contar("rpc_cancelados")
+                    ej.cancelar()
+                    futuro.cancel()
+                    del en_curso[ej]
+                    libres.append(ej)
+                    continue
+                for ev in ej.sondear():
+                    eventos[ev.fase] = ev
+                if not ej.ocupado:
+                    del en_curso[ej]
+                    libres.append(ej)
+                    with self._lock:
+                        if self._en_vuelo.get(clave) is futuro:
+                            del self._en_vuelo[clave]
+                        self._esperando.pop(futuro, None)
+                    try:
+                        futuro.set_result(armar_resultado(None, funcion, datos, eventos))
+                    except Exception as e:
+                        futuro.set_exception(e)
+            self._en_curso = len(en_curso)
+            if en_curso:
+                time.sleep(0.002)
+
+    def estado(self) -> dict:
+        return {"procesos": len(self._ejecutores), "en_cola": self._cola.qsize(),
+                "en_curso": self._en_curso, "max_cola": self._cola.maxsize}
+
+    def cerrar(self):
+        self._cerrado.set()
+        self._hilo.join(timeout=2.0)
+        for ej in self._ejecutores:
+            ej.cerrar()
+
+
+# ---------- JSON-RPC ----------
+def _parametros(metodo, params):
+    if not isinstance(params, dict):
+        raise ErrorRPC(PARAMETROS_INVALIDOS, "params debe ser un objeto.")
+    funcion = params.get("funcion")
+    if not isinstance(funcion, str) or not funcion.strip():
+        raise ErrorRPC(PARAMETROS_INVALIDOS, "Falta 'funcion'.")
+    # solo el relleno: los espacios de adentro importan ("1 2" no es 12);
+    # "x**2 - 1" y "x**2-1" se juntan por la forma canónica (ver enviar)
+    funcion = funcion.strip()
+    datos = None
+    if metodo in ("evaluar", "analizar"):
+        xs = params.get("x", [])
+        datos = [str(v) for v in (xs if isinstance(xs, list) else [xs])]
+        if metodo == "evaluar" and not datos:
+            raise ErrorRPC(PARAMETROS_INVALIDOS, "Falta 'x'.")
+    elif metodo == "muestrear":
+        datos = {k: params[k] for k in ("x_min", "x_max", "n", "y_clip") if k in params}
+    return funcion, datos
+
+
+def atender(pool, pedidos):
+    """Respuestas JSON-RPC para una lista de pedidos (los encola todos antes de esperar)."""
+    esperas = []
+    for pedido in pedidos:
+        ident = pedido.get("id") if isinstance(pedido, dict) else None
+        try:
+            if not isinstance(pedido, dict) or pedido.get("jsonrpc") != "2.0":
+                raise ErrorRPC(PEDIDO_INVALIDO, "Pedido JSON-RPC 2.0 inválido.")
+            metodo = pedido.get("method")
+            if metodo == "metricas":
+                esperas.append((ident, metodo, None, time.perf_counter(), None, None))
+                continue
+            if metodo not in METODOS:
+                raise ErrorRPC(METODO_INEXISTENTE, f"Método desconocido: {metodo}")
+            params = pedido.get("params", {})
+            funcion, datos = _parametros(metodo, params)
+            timeout = min(float(params.get("timeout", pool.timeout)), pool.timeout)
+            futuro = pool.enviar(funcion, METODOS[metodo], datos)
+            esperas.append((ident, metodo, futuro, time.perf_counter(), timeout, funcion))
+        except ErrorRPC as e:
+            esperas.append((ident, None, e, 0.0, None, None))
+        except (TypeError, ValueError) as e:
+            esperas.append((ident, None, ErrorRPC(PARAMETROS_INVALIDOS, str(e)), 0.0, None, None))
+
+    respuestas = []
+    for ident, metodo, futuro, t0, timeout, funcion in esperas:
+        respuesta = {"jsonrpc": "2.0", "id": ident}
+        try:
+            if isinstance(futuro, ErrorRPC):
+                raise futuro
+            if metodo == "metricas":
+                respuesta["result"] = metricas(pool)
+            else:
+                restante = max(0.0, timeout - (time.perf_counter() - t0))
+                try:
+                    resultado = dict(futuro.result(timeout=restante))
+                except FuturoAgotado:
+                    registro.contar("rpc_tiempo_agotado")
+                    pool.abandonar(futuro)
+                    raise ErrorRPC(TIEMPO_AGOTADO, f"Se superaron {timeout:g} s.") from None
+                resultado.pop("indice", None)
+                # un pedido juntado con otro igual devuelve su propio texto
+                resultado["funcion"] = funcion
+                respuesta["result"] = resultado
+                registro.registrar(f"rpc:{metodo}", time.perf_counter() - t0, t0)
+        except ErrorRPC as e:
+            respuesta["error"] = {"code": e.codigo, "message": str(e)}
+        except Exception as e:
+            respuesta["error"] = {"code": ERROR_INTERNO, "message": str(e)}
+        respuestas.append(respuesta)
+    return respuestas
+
+
+def metricas(pool) -> dict:
+    return dict(registro.instantanea(), pool=pool.estado())
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    pool = None
+    silencioso = True
+
+    def _responder(self, codigo: int, cuerpo, cabeceras=()):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        for nombre, valor in cabeceras:
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        if self.path == "/metricas":
+            self._responder(200, metricas(self.pool))
+        elif self.path == "/salud":
+            self._responder(200, {"ok": True})
+        else:
+            self._responder(404, {"error": "no encontrado"})
+
+    def do_POST(self):
+        if self.path not in ("/", "/rpc"):
+            self._responder(404, {"error": "no encontrado"})
+            return
+        largo = int(self.headers.get("Content-Length") or 0)
+        if largo > MAX_CUERPO:
+            self._responder(413, {"error": "pedido demasiado grande"})
+            return
+        registro.contar("rpc_pedidos")
+        try:
+            cuerpo = json.loads(self.rfile.read(largo) or b"null")
+        except ValueError as e:
+            self._responder(200, {"jsonrpc": "2.0", "id": None,
+                                  "error": {"code": ERROR_PARSEO, "message": str(e)}})
+            return
+        lote = isinstance(cuerpo, list)
+        respuestas = atender(self.pool, cuerpo if lote else [cuerpo])
+        if not lote and respuestas[0].get("error", {}).get("code") == OCUPADO:
+            self._responder(503, respuestas[0], [("Retry-After", "1")])
+            return
+        self._responder(200, respuestas if lote else respuestas[0])
+
+    def log_message(self, formato, *args):
+        if not self.silencioso:
+            super().log_message(formato, *args)
+
+
+def servir(host="127.0.0.1", puerto=8765, procesos=2, timeout=10.0, max_cola=64,
+           ruta_cache=None, silencioso=True):
+    """Crea el pool y el servidor; devuelve (servidor, pool) sin bloquear."""
+    pool = PoolAnalisis(procesos, timeout, max_cola, ruta_cache)
+    manejador = type("Manejador", (_Manejador,), {"pool": pool, "silencioso": silencioso})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    return servidor, pool
+
+
+# ---------- Cliente ----------
+class ClienteAnalisis:
+    """Cliente mínimo del servicio (para pruebas y scripts)."""
+
+    def __init__(self, url="http://127.0.0.1:8765", timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._id = 0
+
+    def _post(self, cuerpo):
+        pedido = urllib.request.Request(self.url + "/rpc", json.dumps(cuerpo).encode("utf-8"),
+                                        {"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(pedido, timeout=self.timeout) as r:
+                return json.loads(r.read())
+        except urllib.error.HTTPError as e:
+            # 503 por contrapresión también trae la respuesta JSON-RPC
+            return json.loads(e.read())
+
+    def llamar(self, metodo: str, **params):
+        """Devuelve el resultado o lanza ErrorRPC con el error del servicio."""
+        self._id += 1
+        respuesta = self._post({"jsonrpc": "2.0", "id": self._id, "method": metodo,
+                                "params": params})
+        if "error" in respuesta:
+            raise ErrorRPC(respuesta["error"]["code"], respuesta["error"]["message"])
+        return respuesta["result"]
+
+    def metricas(self) -> dict:
+        with urllib.request.urlopen(self.url + "/metricas", timeout=self.timeout) as r:
+            return json.loads(r.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio JSON-RPC local del analizador.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("-j", "--procesos", type=int, default=2,
+                        help="procesos de análisis precalentados")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="segundos máximos por pedido (y por fase)")
+    parser.add_argument("--max-cola", type=int, default=64,
+                        help="pedidos en espera antes de responder 'ocupado'")
+    parser.add_argument("--cache", default=None, help="archivo SQLite de caché de resultados")
+    parser.add_argument("-v", "--verbose", action="store_true", help="registrar cada pedido HTTP")
+    parser.add_argument("--llamar", metavar="METODO", default=None,
+                        help="en vez de servir, llamar a un servicio ya levantado")
+    parser.add_argument("--funcion", default=None)
+    parser.add_argument("--x", action="append", default=[])
+    args = parser.parse_args(argv)
+
+    if args.llamar:
+        cliente = ClienteAnalisis(f"http://{args.host}:{args.puerto}")
+        if args.llamar == "metricas":
+            print(json.dumps(cliente.metricas(), indent=2, ensure_ascii=False))
+            return 0
+        params = {"funcion": args.funcion}
+        if args.x:
+            params["x"] = args.x
+        try:
+            print(json.dumps(cliente.llamar(args.llamar, **params), indent=2, ensure_ascii=False))
+        except ErrorRPC as e:
+            print(f"Error {e.codigo}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    instrumentacion.activar_desde_entorno()
+    servidor, pool = servir(args.host, args.puerto, args.procesos, args.timeout,
+                            args.max_cola, args.cache, silencioso=not args.verbose)
+    print(f"Escuchando en http://{args.host}:{args.puerto} ({args.procesos} procesos)",
+          file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        pool.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Los caminos rápidos de clasificacion contra sympy (continuous_domain y
+function_range), incluyendo funciones racionales con huecos: ahí el
+dominio excluye el punto y el recorrido tiene que ir por el camino genérico.
+
+    python -m pytest -q test_clasificacion.py
+"""
+import sympy as sp
+from sympy import S
+from sympy.calculus.util import continuous_domain, function_range
+
+import clasificacion
+from analisis_funciones import AnalizadorFunciones
+
+x = sp.Symbol('x', real=True)
+
+CORPUS = [
+    "x**2-1",
+    "x**3-3*x",
+    "1/(x-2)",
+    "(x-1)/(x+2)",
+    "1/x**2",
+    "x/(x**2+1)",
+    "(x**2+1)/(x**2-4)",
+    "1/x+1/(x-1)",
+]
+
+# factores comunes entre numerador y denominador
+CON_HUECOS = [
+    "(x**2-x)/(x-1)",
+    "(x**2+2*x)/(x+2)",
+    "(x**3-2*x)/(x**2-2)",
+    "(x**2-1)/(x-1)**2",
+    "(x**2-4)/(x**2-5*x+6)",
+]
+
+
+def _expr(texto):
+    return sp.sympify(texto, locals={'x': x})
+
+
+def _dominio_rapido(expr):
+    denominador = expr.as_numer_denom()[1]
+    ceros = clasificacion.raices_reales(denominador, x) if denominador.has(x) else []
+    return clasificacion.dominio_rapido(expr, x, clasificacion.clasificar(expr, x), ceros)
+
+
+def test_dominio_rapido():
+    for texto in CORPUS + CON_HUECOS:
+        expr = _expr(texto)
+        assert _dominio_rapido(expr) == continuous_domain(expr, x, S.Reals), texto
+
+
+def test_recorrido_racional():
+    for texto in CORPUS:
+        expr = _expr(texto)
+        esperado = function_range(expr, x, continuous_domain(expr, x, S.Reals))
+        assert clasificacion.recorrido_racional(expr, x) == esperado, texto
+
+
+def test_huecos_van_al_camino_generico():
+    for texto in CON_HUECOS:
+        assert clasificacion.recorrido_racional(_expr(texto), x) is None, texto
+
+
+def test_sesion_con_huecos():
+    analizador = AnalizadorFunciones(con_pasos=False)
+    for texto in CORPUS + CON_HUECOS:
+        expr = _expr(texto)
+        dominio = continuous_domain(expr, x, S.Reals)
+        assert analizador.sesion(texto).dominio == dominio, texto
+        recorrido = analizador.calcular_recorrido(texto)
+        assert recorrido.conjunto == function_range(expr, x, dominio), texto
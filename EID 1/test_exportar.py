@@ -0,0 +1,56 @@
+"""
+Exportación de muestras: formato .eidm (ida y vuelta por mmap) y CSV.
+
+    python -m pytest -q test_exportar.py
+"""
+import math
+import struct
+
+import sympy as sp
+
+import exportar
+import muestreo
+
+x = sp.Symbol('x', real=True)
+
+BLOQUES = [([0.0, 0.5, 1.0], [1.0, None, -2.5]), ([1.5, 2.0], [1e300, -0.0])]
+
+
+def test_binario_ida_y_vuelta(tmp_path):
+    ruta = str(tmp_path / "curva.eidm")
+    assert exportar.escribir_binario(iter(BLOQUES), ruta) == 5
+    with open(ruta, "rb") as f:
+        cabecera = f.read(32)
+    assert struct.unpack("<4sHHQ16x", cabecera) == (b"EIDM", exportar.VERSION, 2, 5)
+    with exportar.leer_binario(ruta) as curva:
+        assert len(curva) == 5
+        assert list(curva.xs) == [0.0, 0.5, 1.0, 1.5, 2.0]
+        assert math.isnan(curva.ys[1])
+        assert list(curva.puntos()) == [(0.0, 1.0), (0.5, None), (1.0, -2.5),
+                                        (1.5, 1e300), (2.0, -0.0)]
+
+
+def test_binario_invalido(tmp_path):
+    ruta = tmp_path / "otro.eidm"
+    ruta.write_bytes(b"NOPE" + bytes(28))
+    try:
+        exportar.leer_binario(str(ruta))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("se aceptó un archivo sin la firma EIDM")
+
+
+def test_csv_ida_y_vuelta(tmp_path):
+    ruta = str(tmp_path / "curva.csv")
+    assert exportar.escribir_csv(iter(BLOQUES), ruta) == 5
+    assert list(exportar.leer_csv(ruta)) == [p for xs, ys in BLOQUES for p in zip(xs, ys)]
+
+
+def test_exportar_con_corte(tmp_path):
+    ruta = str(tmp_path / "polo.eidm")
+    kernel = muestreo.compilar(1 / (x - 0.5), x)
+    assert exportar.exportar(kernel, ruta, 0.0, 2.0, 5, criticos=[0.5]) == 5
+    with exportar.leer_binario(ruta) as curva:
+        assert list(curva.puntos()) == [(0.0, -2.0), (0.5, None), (1.0, 2.0),
+                                        (1.5, 1.0), (2.0, 2 / 3)]
@@ -0,0 +1,62 @@
+"""
+Muestreo por bloques para exportar.
+
+    python -m pytest -q test_muestreo.py
+"""
+import sympy as sp
+
+import muestreo
+
+x = sp.Symbol('x', real=True)
+
+
+def _puntos(bloques):
+    return [p for xs, ys in bloques for p in zip(xs, ys)]
+
+
+def test_corte_en_el_borde_de_un_bloque():
+    # malla 0, 1, 2, 3, 4 en bloques de 2: el polo x = 1 es el último punto del primero
+    kernel = muestreo.compilar(1 / (x - 1), x)
+    puntos = _puntos(muestreo.bloques_uniformes(kernel, 0.0, 4.0, 5, [1.0], bloque=2))
+    assert puntos == [(0.0, -1.0), (1.0, None), (2.0, 1.0), (3.0, 0.5), (4.0, 1 / 3)]
+
+
+def test_corte_fuera_de_la_malla():
+    kernel = muestreo.compilar(1 / (x - 0.5), x)
+    puntos = _puntos(muestreo.bloques_uniformes(kernel, 0.0, 4.0, 5, [0.5], bloque=2))
+    assert [px for px, _ in puntos] == [0.0, 0.5, 1.0, 2.0, 3.0, 4.0]
+    assert puntos[1] == (0.5, None)
+
+
+def test_critico_con_valor_en_la_malla_no_corta():
+    kernel = muestreo.compilar(sp.Piecewise((x, x < 0), (x**2, True)), x)
+    puntos = _puntos(muestreo.bloques_uniformes(kernel, -2.0, 2.0, 5, [0.0], bloque=2))
+    assert puntos == [(-2.0, -2.0), (-1.0, -1.0), (0.0, 0.0), (1.0, 1.0), (2.0, 4.0)]
+
+
+def test_diezmar_conserva_extremos_y_cortes():
+    # 4 columnas en [0, 4): cada una con 250 muestras y un pico adentro
+    n = 1000
+    xs = [4 * i / n for i in range(n)]
+    ys = [((i * 37) % 11) / 10 for i in range(n)]
+    ys[100], ys[600] = 5.0, -5.0
+    ys[400] = ys[401] = None
+    sx, sy = muestreo.diezmar(xs, ys, 0.0, 4.0, 4)
+    assert len(sx) < n and sx == sorted(sx)
+    valores = [y for y in sy if y is not None]
+    assert 5.0 in valores and -5.0 in valores
+    # un solo separador, en su lugar
+    assert sy.count(None) == 1
+    corte = sy.index(None)
+    assert sx[corte] == xs[400]
+    assert all(px < xs[400] for px in sx[:corte]) and all(px > xs[401] for px in sx[corte + 1:])
+    # por columna (y por tramo entre cortes) quedan su mínimo y su máximo
+    for col in range(4):
+        for tramo in ((0, 400), (402, n)):
+            idx = [i for i in range(*tramo) if col <= xs[i] < col + 1]
+            if not idx:
+                continue
+            en_col = [y for px, y in zip(sx, sy) if y is not None and col <= px < col + 1
+                      and xs[tramo[0]] <= px <= xs[tramo[1] - 1]]
+            assert min(en_col) == min(ys[i] for i in idx)
+            assert max(en_col) == max(ys[i] for i in idx)
@@ -0,0 +1,74 @@
+"""
+Búsqueda numérica de raíces (raices.py).
+
+    python -m pytest -q test_raices.py
+"""
+import math
+
+import sympy as sp
+
+import muestreo
+import raices
+
+x = sp.Symbol('x', real=True)
+
+
+def _kernel(expr):
+    return muestreo.compilar(expr, x)
+
+
+def test_brent_cambio_de_signo():
+    f = lambda t: t**3 - 2
+    r = raices.brent(f, 0.0, 2.0, f(0.0), f(2.0))
+    assert abs(r - 2 ** (1 / 3)) < 1e-12
+
+
+def test_brent_sin_valor_en_el_intervalo():
+    f = lambda t: None if 0.4 < t < 0.6 else t - 0.5
+    assert raices.brent(f, 0.0, 1.0, -0.5, 0.5) is None
+
+
+def test_raices_con_cambio_de_signo():
+    encontradas = raices.buscar_raices(_kernel(sp.sin(x)))
+    esperadas = [k * math.pi for k in range(-3, 4)]
+    assert len(encontradas) == len(esperadas)
+    assert all(abs(r - e) < 1e-9 for r, e in zip(encontradas, esperadas))
+
+
+def test_raiz_doble_por_minimo_de_abs():
+    # sin cambio de signo: la encuentra la sección áurea sobre |f|
+    c = 0.123
+    r, fr = raices._minimo_abs(lambda t: (t - c) ** 2, 0.11, 0.13)
+    assert abs(r - c) < 1e-6 and fr < 1e-12
+    encontradas = raices.buscar_raices(_kernel((x - c) ** 2))
+    assert len(encontradas) == 1 and abs(encontradas[0] - c) < 1e-6
+
+
+def test_polos_y_saltos_no_son_raices():
+    assert raices.buscar_raices(_kernel(1 / (x - 0.505))) == []
+    assert raices.buscar_raices(_kernel(sp.floor(x) - sp.Rational(1, 2))) == []
+    encontradas = raices.buscar_raices(_kernel(sp.tan(x)), -2.0, 2.0)
+    assert len(encontradas) == 1 and abs(encontradas[0]) < 1e-12
+
+
+def test_tramo_donde_f_se_anula():
+    encontradas, tramos = raices.buscar_ceros(_kernel(sp.floor(x)))
+    assert encontradas == []
+    assert len(tramos) == 1
+    a, b = tramos[0]
+    assert a == 0.0 and 0.98 < b < 1.0
+
+
+def test_tramo_y_raices_aisladas():
+    encontradas, tramos = raices.buscar_ceros(_kernel(sp.floor(x) * sp.sin(x)))
+    assert len(tramos) == 1 and tramos[0][0] == 0.0
+    # las raíces dentro del tramo (x = 0) no se listan aparte
+    assert all(abs(r) > 1 for r in encontradas)
+    assert any(abs(r - math.pi) < 1e-9 for r in encontradas)
+
+
+def test_intersecciones_curvas():
+    f, g = _kernel(x**2), _kernel(x + 2)
+    puntos = raices.intersecciones_curvas(f, g)
+    assert [round(px, 9) for px, _ in puntos] == [-1.0, 2.0]
+    assert [round(py, 9) for _, py in puntos] == [1.0, 4.0]
@@ -0,0 +1,281 @@
+import multiprocessing as mp
+import queue
+import time
+from collections import namedtuple
+
+from instrumentacion import registro
+
+# Orden en que se ejecutan las fases: primero lo que necesita el gráfico,
+# el recorrido (function_range) al final porque suele ser lo más lento.
+FASES = ("dominio", "criticos", "intersecciones", "evaluacion", "recorrido")
+
+# Presupuesto de tiempo por fase, en segundos
+PRESUPUESTOS = {
+    "dominio": 8.0,
+    "criticos": 8.0,
+    "intersecciones": 10.0,
+    "evaluacion": 5.0,
+    "recorrido": 10.0,
+    "muestreo": 5.0,
+}
+
+# estado: "ok" | "tiempo_agotado" | "error"
+# detalle: eventos de instrumentación del hijo durante la fase
+Evento = namedtuple("Evento", "trabajo fase estado resultado duracion detalle",
+                    defaults=(None,))
+
+
+def contexto_procesos():
+    """
+    Contexto para los procesos de análisis: forkserver donde exista. Los
+    procesos que se crean tarde (al reiniciar uno que se pasó de tiempo, o
+    uno más por función comparada) salen de un proceso con SymPy ya
+    importado y sin los hilos del que los pide, así que no heredan locks
+    tomados.
+    """
+    if "forkserver" not in mp.get_all_start_methods():
+        return mp.get_context()
+    ctx = mp.get_context("forkserver")
+    ctx.set_forkserver_preload(["analisis_funciones", "muestreo"])
+    return ctx
+
+
+def _muestrear(sesion, parametros):
+    """Fase "muestreo" (fuera de FASES, la piden el servicio y quien la necesite)."""
+    import muestreo
+    if not sesion.valida:
+        raise ValueError(sesion.error)
+    p = parametros or {}
+    x_min, x_max = float(p.get("x_min", -10.0)), float(p.get("x_max", 10.0))
+    y_clip = p.get("y_clip")
+    if p.get("n"):
+        xs = muestreo.linspace(x_min, x_max, int(p["n"]))
+        return muestreo.Muestreo(xs, sesion.kernel.evaluar_lote(xs, y_clip=y_clip), [], len(xs))
+    return muestreo.muestrear_adaptativo(sesion.kernel, x_min, x_max,
+                                         criticos=sesion.puntos_criticos, y_clip=y_clip)
+
+
+def _ejecutar_fase(analizador, sesion, fase, x_str):
+    """x_str: valor(es) de x; en la fase muestreo, un dict con x_min, x_max, n, y_clip."""
+    if fase == "dominio":
+        return analizador.calcular_dominio(sesion)
+    if fase == "recorrido":
+        return analizador.calcular_recorrido(sesion)
+    if fase == "intersecciones":
+        return analizador.calcular_intersecciones(sesion)
+    if fase == "evaluacion":
+        if not x_str:
+            return None
+        if isinstance(x_str, (list, tuple)):
+            if not analizador.con_pasos:
+                # sin paso a paso alcanza con la evaluación por lotes
+                return analizador.evaluar_lote(sesion, [str(v) for v in x_str], exacto=True)
+            return [analizador.evaluar_funcion(sesion, str(v)) for v in x_str]
+        return analizador.evaluar_funcion(sesion, x_str)
+    if fase == "muestreo":
+        return _muestrear(sesion, x_str)
+    if fase == "criticos":
+        # abscisas críticas y si el dominio las excluye (asíntotas / huecos)
+        if not sesion.valida:
+            return []
+        return sesion.criticos
+    raise ValueError(f"Fase desconocida: {fase}")
+
+
+def _bucle_trabajador(entrada, salida, ruta_cache, con_pasos=True):
+    """Proceso hijo: recibe (trabajo, fase, funcion, x) y responde con Evento."""
+    from analisis_funciones import AnalizadorFunciones
+    cache = kernels = None
+    if ruta_cache:
+        from cache_resultados import CacheResultados, carpeta_kernels
+        from muestreo import CacheKernels
+        cache = CacheResultados(ruta=ruta_cache)
+        kernels = CacheKernels(carpeta=carpeta_kernels(ruta_cache))
+    analizador = AnalizadorFunciones(cache=cache, con_pasos=con_pasos, kernels=kernels)
+    ultima = (None, None)
+    # avisa que ya cargó SymPy: el reloj de la fase empieza recién aquí
+    salida.put(Evento(None, None, "listo", None, 0.0))
+
+    while True:
+        tarea = entrada.get()
+        if tarea is None:
+            break
+        trabajo, fase, funcion_str, x_str = tarea
+        # la sesión se comparte entre las fases de un mismo trabajo
+        if ultima[0] != funcion_str:
+            ultima = (funcion_str, analizador.sesion(funcion_str))
+        t0 = time.perf_counter()
+        try:
+            with registro.fase(f"fase:{fase}"):
+                res = _ejecutar_fase(analizador, ultima[1], fase, x_str)
+            estado = "ok"
+        except Exception as e:
+            res, estado = str(e), "error"
+        salida.put(Evento(trabajo, fase, estado, res, time.perf_counter() - t0,
+                          registro.tomar_eventos()))
+
+
+class Trabajador:
+    """Un proceso hijo con sus colas. Se puede matar aunque SymPy esté ocupado."""
+
+    def __init__(self, ctx, ruta_cache=None, con_pasos=True):
+        self.entrada = ctx.Queue()
+        self.salida = ctx.Queue()
+        self.proceso = ctx.Process(target=_bucle_trabajador,
+                                   args=(self.entrada, self.salida, ruta_cache, con_pasos),
+                                   daemon=True)
+        self.proceso.start()
+        self.listo = False
+
+    def vivo(self) -> bool:
+        return self.proceso.is_alive()
+
+    def matar(self):
+        if self.proceso.is_alive():
+            self.proceso.terminate()
+        self.proceso.join(timeout=1.0)
+        if self.proceso.is_alive():
+            self.proceso.kill()
+            self.proceso.join(timeout=1.0)
+        for q in (self.entrada, self.salida):
+            q.cancel_join_thread()
+            q.close()
+
+    def cerrar(self):
+        try:
+            self.entrada.put(None)
+            self.proceso.join(timeout=1.0)
+        except (OSError, ValueError):
+            pass
+        self.matar()
+
+
+class EjecutorAnalisis:
+    """
+    Corre las fases del análisis en un proceso aparte, una a la vez, con un
+    presupuesto de tiempo por fase. No bloquea: quien lo usa llama a
+    `sondear()` periódicamente (p. ej. desde un QTimer) y recibe los eventos
+    de las fases que terminaron o se agotaron. Si una fase se pasa de su
+    presupuesto se mata el proceso y se sigue con la fase siguiente en un
+    proceso nuevo, así que siempre hay resultados parciales.
+    """
+
+    def __init__(self, presupuestos=None, ruta_cache=None, ctx=None, con_pasos=True):
+        self.presupuestos = dict(PRESUPUESTOS)
+        if presupuestos:
+            self.presupuestos.update(presupuestos)
+        self.ruta_cache = ruta_cache
+        # con_pasos=False: los hijos no arman el paso a paso (modo por lotes)
+        self.con_pasos = con_pasos
+        self._ctx = ctx or mp.get_context()
+        self._trabajador = None
+        self._trabajo = 0
+        self._tarea = None
+        self._pendientes = []
+        self._fase = None
+        self._inicio_fase = 0.0
+
+    # ---------- Procesos ----------
+    def _asegurar_trabajador(self):
+        if self._trabajador is None or not self._trabajador.vivo():
+            if self._trabajador is not None:
+                self._trabajador.matar()
+            self._trabajador = Trabajador(self._ctx, self.ruta_cache, self.con_pasos)
+        return self._trabajador
+
+    def _reiniciar_trabajador(self):
+        if self._trabajador is not None:
+            self._trabajador.matar()
+        # se deja uno nuevo calentando para la próxima fase o el próximo clic
+        self._trabajador = Trabajador(self._ctx, self.ruta_cache, self.con_pasos)
+
+    def precalentar(self):
+        self._asegurar_trabajador()
+
+    # ---------- Trabajos ----------
+    @property
+    def ocupado(self) -> bool:
+        return self._fase is not None
+
+    def iniciar(self, funcion_str: str, x_str: str = "", fases=FASES) -> int:
+        """Encola un trabajo nuevo; si había uno en curso se cancela."""
+        if self.ocupado:
+            self.cancelar()
+        self._trabajo += 1
+        self._tarea = (funcion_str, x_str)
+        self._pendientes = list(fases)
+        self._siguiente_fase()
+        return self._trabajo
+
+    def cancelar(self):
+        if self.ocupado:
+            # SymPy no se puede interrumpir desde afuera: hay que matar el proceso
+            self._reiniciar_trabajador()
+        self._pendientes = []
+        self._fase = None
+
+    def _siguiente_fase(self):
+        self._fase = None
+        if not self._pendientes:
+            return
+        fase = self._pendientes.pop(0)
+        trabajador = self._asegurar_trabajador()
+        trabajador.entrada.put((self._trabajo, fase) + self._tarea)
+        self._fase = fase
+        self._inicio_fase = time.monotonic()
+
+    def sondear(self):
+        """Devuelve los eventos disponibles sin bloquear."""
+        eventos = []
+        while self._fase is not None:
+            try:
+                ev = self._trabajador.salida.get_nowait()
+            except queue.Empty:
+                ev = None
+            except (OSError, ValueError, EOFError):
+                ev = Evento(self._trabajo, self._fase, "error",
+                            "El proceso de análisis terminó inesperadamente.", 0.0)
+
+            if ev is not None:
+                if ev.estado == "listo":
+                    self._trabajador.listo = True
+                    self._inicio_fase = time.monotonic()
+                    continue
+                if ev.trabajo != self._trabajo or ev.fase != self._fase:
+                    continue
+                registro.incorporar(ev.detalle)
+                eventos.append(ev)
+                self._siguiente_fase()
+                continue
+
+            transcurrido = time.monotonic() - self._inicio_fase
+            if self._trabajador.listo and transcurrido > self.presupuestos.get(self._fase, 10.0):
+                eventos.append(Evento(self._trabajo, self._fase, "tiempo_agotado",
+                                      None, transcurrido))
+                self._reiniciar_trabajador()
+                self._siguiente_fase()
+            elif not self._trabajador.vivo():
+                eventos.append(Evento(self._trabajo, self._fase, "error",
+                                      "El proceso de análisis terminó inesperadamente.",
+                                      transcurrido))
+                self._reiniciar_trabajador()
+                self._siguiente_fase()
+            else:
+                break
+        return eventos
+
+    def esperar(self, intervalo: float = 0.02):
+        """Versión bloqueante (sin interfaz): itera eventos hasta terminar el trabajo."""
+        while True:
+            for ev in self.sondear():
+                yield ev
+            if not self.ocupado:
+                return
+            time.sleep(intervalo)
+
+    def cerrar(self):
+        self._pendientes = []
+        self._fase = None
+        if self._trabajador is not None:
+            self._trabajador.cerrar()
+            self._trabajador = None